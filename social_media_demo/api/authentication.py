@@ -0,0 +1,148 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import authentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+class UserCache:
+    """
+    Bounded, thread-safe LRU of user rows with a per-entry TTL.
+
+    Only field values are stored and every hit builds a fresh instance, so
+    requests never share a mutable user object.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, model, user_id):
+        key = str(user_id)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, db, values = entry
+            if expires <= time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+        names = [field.attname for field in model._meta.concrete_fields]
+        return model.from_db(db, names, values)
+
+    def set(self, user):
+        if self.maxsize <= 0:
+            return
+        values = [getattr(user, field.attname) for field in user._meta.concrete_fields]
+        entry = (time.monotonic() + self.ttl, user._state.db, values)
+        with self.lock:
+            self.entries[str(user.pk)] = entry
+            self.entries.move_to_end(str(user.pk))
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self.lock:
+            self.entries.pop(str(user_id), None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+# Invalidated by api.signals whenever a user is saved or deleted in this
+# process; the TTL bounds how stale other processes can be.
+user_cache = UserCache(settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_TTL)
+
+
+class JWTAuthentication(authentication.JWTAuthentication):
+    """
+    simplejwt's ``JWTAuthentication`` resolving users through ``user_cache``,
+    with a coroutine counterpart, ``aauthenticate``, that ``AsyncAPIView``
+    awaits on the event loop.
+    """
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+
+        return await self.aget_user(validated_token), validated_token
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+    def check_user(self, user, validated_token):
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+    def get_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        user = user_cache.get(self.user_model, user_id)
+        if user is None:
+            try:
+                user = self.user_model.objects.get(
+                    **{api_settings.USER_ID_FIELD: user_id}
+                )
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            user_cache.set(user)
+
+        self.check_user(user, validated_token)
+        return user
+
+    async def aget_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        user = user_cache.get(self.user_model, user_id)
+        if user is None:
+            try:
+                user = await self.user_model.objects.aget(
+                    **{api_settings.USER_ID_FIELD: user_id}
+                )
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            user_cache.set(user)
+
+        self.check_user(user, validated_token)
+        return user
+
+
+class JWTTokenUserAuthentication(JWTAuthentication):
+    """
+    Builds ``request.user`` from the token claims alone, without touching the
+    database or ``user_cache``. Only for views that need nothing but
+    ``request.user.id``: deactivation and password changes are not noticed
+    until the token expires.
+    """
+
+    def get_user(self, validated_token):
+        self.get_user_id(validated_token)
+        return api_settings.TOKEN_USER_CLASS(validated_token)
+
+    async def aget_user(self, validated_token):
+        return self.get_user(validated_token)
@@ -0,0 +1,44 @@
+import hashlib
+from functools import wraps
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+
+def make_etag(request, *parts):
+    """Hash ``parts`` with the user and URL into a validator for one response."""
+    source = repr((str(request.user.id), request.get_full_path(), parts))
+    return quote_etag(hashlib.md5(source.encode()).hexdigest())
+
+
+def conditional(etag_func):
+    """
+    Answer a GET whose ``If-None-Match`` still matches ``etag_func(request)``
+    with a 304 before the handler runs, and send the ETag with full responses.
+
+    ``etag_func`` should read an aggregate or a few narrow columns, not build
+    the response. It runs before the handler so the validator can never be
+    newer than the data.
+
+    The computed ETag is also left on ``request.etag`` so ``cache_response``
+    can key cached bodies by the validator they were built under.
+    """
+
+    def decorator(handler):
+        @wraps(handler)
+        def wrapper(self, request, *args, **kwargs):
+            etag = etag_func(request)
+            not_modified = get_conditional_response(request, etag=etag)
+            if not_modified is not None:
+                not_modified.headers["ETag"] = etag
+                return not_modified
+
+            request.etag = etag
+            response = handler(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                response.headers.setdefault("ETag", etag)
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,212 @@
+import atexit
+import logging
+import random
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import (
+    Case,
+    F,
+    IntegerField,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, Greatest
+from api.models import Post, PostCounterShard
+from api.response_cache import bump_versions
+
+logger = logging.getLogger(__name__)
+
+COUNTER_FIELDS = ("comments_count", "likes_count", "shares_count")
+
+
+def increment_counter(post_id, field, delta):
+    """
+    Atomically add ``delta`` to the ``field`` counter of a post.
+
+    This is a single ``UPDATE`` touching only the counter column, clamped at
+    zero. With ``POST_COUNTER_SHARDS`` set the delta goes to a random shard
+    row instead, and reads sum the shards back in (``counter_shard_sums``).
+    Like deltas are coalesced in ``like_buffer`` first when
+    ``LIKES_COUNT_WRITE_BEHIND`` is enabled.
+    """
+    if field == "likes_count" and settings.LIKES_COUNT_WRITE_BEHIND:
+        like_buffer.add(post_id, delta)
+        return
+    write_counter(post_id, field, delta)
+
+
+def write_counter(post_id, field, delta):
+    """Write a counter delta straight to the database, bypassing any buffer."""
+    if settings.POST_COUNTER_SHARDS:
+        shard = random.randrange(settings.POST_COUNTER_SHARDS)
+        _increment_shard(post_id, field, shard, delta)
+        return
+    Post.objects.filter(pk=post_id).update(**{field: Greatest(F(field) + delta, 0)})
+
+
+def apply_counter_deltas(field, deltas):
+    """
+    Add a ``{post_id: delta}`` mapping to the ``field`` counters.
+
+    Without shards or write-behind this is one grouped ``UPDATE`` over all
+    the posts instead of one statement per post.
+    """
+    deltas = {post_id: delta for post_id, delta in deltas.items() if delta}
+    buffered = field == "likes_count" and settings.LIKES_COUNT_WRITE_BEHIND
+    if settings.POST_COUNTER_SHARDS or buffered:
+        for post_id, delta in deltas.items():
+            increment_counter(post_id, field, delta)
+        return
+    if not deltas:
+        return
+    delta = Case(
+        *[When(pk=post_id, then=Value(delta)) for post_id, delta in deltas.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    Post.objects.filter(pk__in=deltas).update(**{field: Greatest(F(field) + delta, 0)})
+
+
+def _increment_shard(post_id, field, shard, delta):
+    shards = PostCounterShard.objects.filter(post_id=post_id, field=field, shard=shard)
+    if shards.update(value=F("value") + delta):
+        return
+    try:
+        with transaction.atomic():
+            PostCounterShard.objects.create(
+                post_id=post_id, field=field, shard=shard, value=delta
+            )
+    except IntegrityError:
+        # Another request created the shard first
+        shards.update(value=F("value") + delta)
+
+
+def counter_shard_sums(post="pk"):
+    """
+    Return ``annotate()`` arguments adding ``<field>_shards``, the sum of the
+    shards of each post counter, or nothing when counters are not sharded.
+
+    ``post`` is the lookup of the post ID on the annotated queryset, e.g.
+    ``"post"`` for ``FeedEntry``. ``counter_value`` adds the sums back in.
+    """
+    if not settings.POST_COUNTER_SHARDS:
+        return {}
+    return {
+        f"{field}_shards": Coalesce(
+            Subquery(
+                PostCounterShard.objects.filter(post_id=OuterRef(post), field=field)
+                .order_by()
+                .values("post_id")
+                .annotate(total=Sum("value"))
+                .values("total")
+            ),
+            0,
+        )
+        for field in COUNTER_FIELDS
+    }
+
+
+def counter_value(post, field):
+    """
+    Return the ``field`` counter of a post instance or ``.values()`` row,
+    including any shard sum annotated by ``counter_shard_sums``.
+    """
+    if isinstance(post, dict):
+        return max(post[field] + post.get(f"{field}_shards", 0), 0)
+    return max(getattr(post, field) + getattr(post, f"{field}_shards", 0), 0)
+
+
+def fold_counter_shards():
+    """Move every shard's value into its post's column and drop the shards."""
+    folded = 0
+    pairs = PostCounterShard.objects.values_list("post_id", "field").distinct()
+    for post_id, field in pairs:
+        with transaction.atomic():
+            shards = list(
+                PostCounterShard.objects.select_for_update().filter(
+                    post_id=post_id, field=field
+                )
+            )
+            total = sum(shard.value for shard in shards)
+            Post.objects.filter(pk=post_id).update(
+                **{field: Greatest(F(field) + total, 0)}
+            )
+            PostCounterShard.objects.filter(
+                pk__in=[shard.pk for shard in shards]
+            ).delete()
+        folded += 1
+    return folded
+
+
+class CounterBuffer:
+    """
+    Per-process write-behind buffer for one ``Post`` counter.
+
+    Deltas are summed per post in memory and flushed by a background thread
+    every ``COUNTER_FLUSH_INTERVAL`` seconds as one ``UPDATE`` per post,
+    so a like storm on a post costs a few writes per second instead of one
+    per like. Pending deltas are also flushed at interpreter exit.
+    """
+
+    def __init__(self, field, interval=None):
+        self.field = field
+        self.interval = interval
+        self._deltas = defaultdict(int)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def add(self, post_id, delta):
+        with self._lock:
+            self._deltas[post_id] += delta
+            if self._thread is None:
+                self._start()
+
+    def _start(self):
+        interval = self.interval or settings.COUNTER_FLUSH_INTERVAL
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(interval,),
+            name=f"{self.field}-flusher",
+            daemon=True,
+        )
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def _run(self, interval):
+        stopped = threading.Event()
+        while not stopped.wait(interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Failed to flush buffered %s deltas", self.field)
+            finally:
+                close_old_connections()
+
+    def flush(self):
+        """Write all pending deltas; anything that fails is kept for later."""
+        with self._lock:
+            deltas, self._deltas = self._deltas, defaultdict(int)
+        items = sorted(deltas.items())
+        written = 0
+        try:
+            for post_id, delta in items:
+                if delta:
+                    write_counter(post_id, self.field, delta)
+                written += 1
+        finally:
+            if written < len(items):
+                with self._lock:
+                    for post_id, delta in items[written:]:
+                        self._deltas[post_id] += delta
+            if written:
+                # Feeds cached since the like committed still hold the old count
+                bump_versions("posts")
+
+
+like_buffer = CounterBuffer("likes_count")
@@ -0,0 +1,148 @@
+import asyncio
+import itertools
+import json
+import threading
+from collections import defaultdict
+from functools import partial
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.module_loading import import_string
+from rest_framework import renderers
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(settings.EVENT_BROKER)()
+    return _broker
+
+
+def publish_event(user_id, kind, data):
+    """Push an event to ``user_id``'s streams once the transaction commits."""
+    transaction.on_commit(partial(get_broker().publish, str(user_id), kind, data))
+
+
+def user_summary(user):
+    return {"id": user.id, "username": user.username}
+
+
+def format_event(event_id, kind, data):
+    payload = json.dumps(data, cls=DjangoJSONEncoder)
+    return f"id: {event_id}\nevent: {kind}\ndata: {payload}\n\n".encode()
+
+
+class Subscription:
+    """
+    Bounded queue of events for one connected client, owned by the event
+    loop that created it. A full queue applies ``policy``: "drop_oldest"
+    discards the oldest event and "disconnect" ends the stream.
+    """
+
+    def __init__(self, broker, channel, maxsize, policy):
+        self.broker = broker
+        self.channel = channel
+        self.policy = policy
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+        self.closed = False
+
+    def put(self, event):
+        if self.closed:
+            return
+        if self.queue.full():
+            if self.policy == "disconnect":
+                self.close()
+                while not self.queue.empty():
+                    self.queue.get_nowait()
+                self.queue.put_nowait(None)
+                return
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def get(self):
+        """Return the next event, or ``None`` once the stream has been closed."""
+        return await self.queue.get()
+
+    def close(self):
+        self.closed = True
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """
+    Fans events out to subscriptions in this process. ``publish`` may be
+    called from any thread; delivery is handed to each subscriber's loop.
+    """
+
+    def __init__(self):
+        self.maxsize = settings.EVENT_QUEUE_SIZE
+        self.policy = settings.EVENT_SLOW_CONSUMER_POLICY
+        self.subscriptions = defaultdict(set)
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel, self.maxsize, self.policy)
+        with self.lock:
+            self.subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscribers = self.subscriptions.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self.subscriptions[subscription.channel]
+
+    def publish(self, channel, kind, data):
+        with self.lock:
+            subscribers = list(self.subscriptions.get(channel, ()))
+        if not subscribers:
+            return
+        event = (next(self.ids), kind, data)
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, event)
+            except RuntimeError:
+                # The subscriber's loop has shut down
+                self.unsubscribe(subscription)
+
+
+class EventStreamRenderer(renderers.BaseRenderer):
+    """Renders error responses of the event stream as a single ``error`` event."""
+
+    media_type = "text/event-stream"
+    format = "event-stream"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return format_event(0, "error", data)
+
+
+async def event_stream(channel):
+    """Yield server-sent events published to ``channel`` until disconnected."""
+    subscription = get_broker().subscribe(channel)
+    try:
+        yield b": connected\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    subscription.get(), settings.EVENT_STREAM_HEARTBEAT
+                )
+            except TimeoutError:
+                # Keeps proxies from timing out an idle connection
+                yield b": keepalive\n\n"
+                continue
+            if event is None:
+                break
+            yield format_event(*event)
+    finally:
+        subscription.close()
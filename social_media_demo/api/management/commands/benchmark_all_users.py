@@ -0,0 +1,80 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.test import APIRequestFactory, force_authenticate
+from api.models import CustomUser, Friendship
+from api.users.views import GetAllUserView
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure all-users latency as the viewer's friend count grows. "
+        "Test data is created inside a transaction and rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--friends",
+            default="10,100,1000,10000,50000",
+            help="Comma-separated friend counts to measure.",
+        )
+        parser.add_argument(
+            "--strangers",
+            type=int,
+            default=1000,
+            help="Users who are not friends and should be listed.",
+        )
+        parser.add_argument("--repeat", type=int, default=50)
+
+    def handle(self, *args, **options):
+        friend_counts = [int(count) for count in options["friends"].split(",")]
+        view = GetAllUserView.as_view()
+        factory = APIRequestFactory()
+
+        self.stdout.write(f"{'friends':>8} {'median ms':>10} {'p95 ms':>10}")
+        for count in friend_counts:
+            with transaction.atomic():
+                viewer = self.create_graph(count, options["strangers"])
+                timings = []
+                for _ in range(options["repeat"]):
+                    request = factory.get("/all-users")
+                    force_authenticate(request, user=viewer)
+                    started = time.perf_counter()
+                    response = view(request)
+                    response.render()
+                    timings.append((time.perf_counter() - started) * 1000)
+                transaction.set_rollback(True)
+
+            timings.sort()
+            p95 = timings[max(int(len(timings) * 0.95) - 1, 0)]
+            self.stdout.write(
+                f"{count:>8} {statistics.median(timings):>10.2f} {p95:>10.2f}"
+            )
+
+    def create_graph(self, friend_count, stranger_count):
+        viewer = CustomUser.objects.create(username="benchmark-viewer")
+        friends = CustomUser.objects.bulk_create(
+            [CustomUser(username=f"benchmark-friend-{i}") for i in range(friend_count)],
+            batch_size=5000,
+        )
+        CustomUser.objects.bulk_create(
+            [
+                CustomUser(username=f"benchmark-stranger-{i}")
+                for i in range(stranger_count)
+            ],
+            batch_size=5000,
+        )
+        Friendship.objects.bulk_create(
+            [
+                edge
+                for friend in friends
+                for edge in (
+                    Friendship(user=viewer, friend=friend),
+                    Friendship(user=friend, friend=viewer),
+                )
+            ],
+            batch_size=5000,
+        )
+        return viewer
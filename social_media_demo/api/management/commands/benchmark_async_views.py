@@ -0,0 +1,98 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.test import AsyncClient, Client, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from api.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare throughput and tail latency of a read endpoint served by "
+        "its sync view from a thread pool and by its async view on one "
+        "event loop, at the same concurrency. Requests go through Django's "
+        "in-process test clients, so this measures the views and the "
+        "database, not a WSGI or ASGI server. The response cache is replaced "
+        "by a dummy cache for the run so every sync request renders the "
+        "response; sync views still compute their ETag."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("username", help="User to authenticate as.")
+        parser.add_argument(
+            "--path",
+            default="/create-post",
+            help="Sync endpoint; the async one is the same path under /async/.",
+        )
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=50)
+
+    def handle(self, *args, **options):
+        try:
+            user = CustomUser.objects.get(username=options["username"])
+        except CustomUser.DoesNotExist:
+            raise CommandError(f"User {options['username']!r} does not exist.")
+
+        headers = {"Authorization": f"Bearer {AccessToken.for_user(user)}"}
+        sync_path = options["path"]
+        async_path = "/async" + sync_path
+        total, concurrency = options["requests"], options["concurrency"]
+
+        self.stdout.write(
+            f"{'view':>6} {'req/s':>10} {'p50 ms':>10} {'p99 ms':>10} {'errors':>7}"
+        )
+        # The async views have no response cache; serving the sync ones from
+        # it would compare a cache lookup against a full render
+        caches = {
+            **settings.CACHES,
+            "benchmark": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+        }
+        with override_settings(CACHES=caches, RESPONSE_CACHE="benchmark"):
+            self.report("sync", *self.run_sync(sync_path, headers, total, concurrency))
+            self.report(
+                "async",
+                *asyncio.run(self.run_async(async_path, headers, total, concurrency)),
+            )
+
+    def run_sync(self, path, headers, total, concurrency):
+        def fetch(_):
+            started = time.perf_counter()
+            try:
+                return Client().get(path, headers=headers).status_code, (
+                    time.perf_counter() - started
+                )
+            finally:
+                close_old_connections()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(fetch, range(total)))
+        return results, time.perf_counter() - started
+
+    async def run_async(self, path, headers, total, concurrency):
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch():
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.get(path, headers=headers)
+                return response.status_code, time.perf_counter() - started
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(fetch() for _ in range(total)))
+        return results, time.perf_counter() - started
+
+    def report(self, label, results, elapsed):
+        timings = sorted(duration * 1000 for _, duration in results)
+        errors = sum(status != 200 for status, _ in results)
+        p99 = timings[max(int(len(timings) * 0.99) - 1, 0)]
+        self.stdout.write(
+            f"{label:>6} {len(results) / elapsed:>10.1f} "
+            f"{statistics.median(timings):>10.2f} {p99:>10.2f} {errors:>7}"
+        )
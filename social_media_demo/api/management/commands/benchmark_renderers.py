@@ -0,0 +1,93 @@
+import statistics
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from api.models import CustomUser, Post
+from api.posts.serializers import PostSerializer
+from api.renderers import ORJSONRenderer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare encode time of a feed page under DRF's JSONRenderer and "
+        "ORJSONRenderer. Posts are built in memory; no database is needed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=50)
+
+    def handle(self, *args, **options):
+        posts = self.build_posts(options["posts"])
+        liked = {post.id for post in posts[::3]}
+        page = {
+            "next": "http://testserver/create-post?cursor=abc",
+            "results": PostSerializer(
+                posts, many=True, context={"liked_post_ids": liked}
+            ).data,
+        }
+        # The same rows with UUIDs and datetimes left to the renderer
+        native = {
+            "results": [
+                {
+                    "id": post.id,
+                    "user": post.user_id,
+                    "caption": post.caption,
+                    "likes_count": post.likes_count,
+                    "created_at": post.created_at,
+                    "updated_at": post.updated_at,
+                }
+                for post in posts
+            ]
+        }
+
+        self.stdout.write(
+            f"{'payload':>10} {'renderer':>15} {'median ms':>10} "
+            f"{'p95 ms':>10} {'bytes':>9}"
+        )
+        for label, data in (("serialized", page), ("native", native)):
+            outputs = {}
+            for renderer in (JSONRenderer(), ORJSONRenderer()):
+                timings = []
+                for _ in range(options["repeat"]):
+                    started = time.perf_counter()
+                    output = renderer.render(data, "application/json")
+                    timings.append((time.perf_counter() - started) * 1000)
+                outputs[type(renderer).__name__] = output
+
+                timings.sort()
+                p95 = timings[max(int(len(timings) * 0.95) - 1, 0)]
+                self.stdout.write(
+                    f"{label:>10} {type(renderer).__name__:>15} "
+                    f"{statistics.median(timings):>10.2f} {p95:>10.2f} "
+                    f"{len(output):>9}"
+                )
+            identical = len(set(outputs.values())) == 1
+            self.stdout.write(f"{'':>10} byte-identical output: {identical}")
+
+    def build_posts(self, count):
+        now = timezone.now()
+        users = [
+            CustomUser(id=uuid.uuid4(), username=f"benchmark-user-{i}")
+            for i in range(50)
+        ]
+        posts = []
+        for i in range(count):
+            created_at = now - timedelta(minutes=i, microseconds=i)
+            posts.append(
+                Post(
+                    id=count - i,
+                    user=users[i % len(users)],
+                    caption=f"Benchmark post {i} — café",
+                    likes_count=i * 7,
+                    comments_count=i % 13,
+                    shares_count=i % 5,
+                    created_at=created_at,
+                    updated_at=created_at,
+                )
+            )
+        return posts
@@ -0,0 +1,89 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from api.models import CustomUser, FriendSuggestion, Friendship
+
+
+class Command(BaseCommand):
+    help = (
+        "Rank friend-of-friend candidates by mutual friend count and store the "
+        "top K suggestions for every user."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top-k", type=int, default=50)
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Number of users whose scores are computed at a time.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            import numpy as np
+            from scipy import sparse
+        except ImportError:
+            raise CommandError("numpy and scipy are required for this command.")
+
+        top_k = options["top_k"]
+        chunk_size = options["chunk_size"]
+
+        user_ids = list(CustomUser.objects.order_by("id").values_list("id", flat=True))
+        index = {user_id: position for position, user_id in enumerate(user_ids)}
+        size = len(user_ids)
+
+        # Friendship stores both directions, so the adjacency matrix is symmetric
+        edges = np.array(
+            [
+                (index[user_id], index[friend_id])
+                for user_id, friend_id in Friendship.objects.values_list(
+                    "user_id", "friend_id"
+                ).iterator(chunk_size=10000)
+            ],
+            dtype=np.int64,
+        ).reshape(-1, 2)
+        adjacency = sparse.csr_matrix(
+            (np.ones(len(edges), dtype=np.int32), (edges[:, 0], edges[:, 1])),
+            shape=(size, size),
+        )
+
+        stored = 0
+        for start in range(0, size, chunk_size):
+            stop = min(start + chunk_size, size)
+            rows = adjacency[start:stop]
+            # (A @ A)[u, v] is the number of friends u and v have in common;
+            # drop the users themselves and the people they already know
+            product = rows @ adjacency
+            known = rows + sparse.eye(
+                stop - start, size, k=start, dtype=np.int32, format="csr"
+            )
+            mutual = sparse.csr_matrix(product - product.multiply(known))
+            mutual.eliminate_zeros()
+
+            suggestions = []
+            for offset in range(stop - start):
+                begin, end = mutual.indptr[offset], mutual.indptr[offset + 1]
+                columns = mutual.indices[begin:end]
+                counts = mutual.data[begin:end]
+                if len(counts) > top_k:
+                    keep = np.argpartition(-counts, top_k)[:top_k]
+                    columns, counts = columns[keep], counts[keep]
+                suggestions.extend(
+                    FriendSuggestion(
+                        user_id=user_ids[start + offset],
+                        suggested_id=user_ids[column],
+                        mutual_count=int(count),
+                    )
+                    for column, count in zip(columns, counts)
+                )
+
+            with transaction.atomic():
+                FriendSuggestion.objects.filter(
+                    user_id__in=user_ids[start:stop]
+                ).delete()
+                FriendSuggestion.objects.bulk_create(suggestions, batch_size=2000)
+            stored += len(suggestions)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Stored {stored} suggestions for {size} users.")
+        )
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from api.counters import fold_counter_shards
+
+
+class Command(BaseCommand):
+    help = "Fold sharded post counters back into the Post counter columns."
+
+    def handle(self, *args, **options):
+        folded = fold_counter_shards()
+        self.stdout.write(self.style.SUCCESS(f"Folded {folded} sharded counters."))
@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from api.models import Comment, Like, Post, PostCounterShard, Share
+
+
+def count_per_post(model):
+    """Correlated subquery counting the ``model`` rows of the outer post."""
+    counts = (
+        model.objects.filter(post=OuterRef("pk"))
+        .order_by()
+        .values("post")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    return Coalesce(Subquery(counts), 0)
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute likes_count, comments_count and shares_count of every post "
+        "from the Like, Comment and Share tables, dropping any counter shards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=5000,
+            help="Number of post IDs recounted per UPDATE statement.",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        last_id = Post.objects.aggregate(last=Max("id"))["last"] or 0
+
+        # Each chunk is one set-based UPDATE over a post ID range; the counts
+        # are grouped aggregates served by the post_id indexes, so no rows are
+        # loaded into Python and memory stays flat however large Like grows.
+        # The recount already includes the deltas held in shard rows, so they
+        # are dropped in the same transaction rather than summed in again.
+        updated = 0
+        for start in range(0, last_id + 1, chunk_size):
+            with transaction.atomic():
+                PostCounterShard.objects.filter(
+                    post_id__gte=start, post_id__lt=start + chunk_size
+                ).delete()
+                updated += Post.objects.filter(
+                    id__gte=start, id__lt=start + chunk_size
+                ).update(
+                    likes_count=count_per_post(Like),
+                    comments_count=count_per_post(Comment),
+                    shares_count=count_per_post(Share),
+                )
+
+        self.stdout.write(self.style.SUCCESS(f"Recounted {updated} posts."))
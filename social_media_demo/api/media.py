@@ -0,0 +1,129 @@
+import mimetypes
+import os
+import re
+import stat
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_safe
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeFile:
+    """Read-only view of ``length`` bytes of ``file`` starting at ``start``."""
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """
+    Return the ``(start, end)`` byte positions requested by a single-range
+    ``Range`` header, ``None`` to serve the whole file, or ``False`` when the
+    range cannot be satisfied.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        start = max(size - int(last), 0)
+        end = size - 1
+    if start > end or start >= size:
+        return False
+    return start, end
+
+
+@require_safe
+def serve_media(request, path):
+    """
+    Serve a file from ``MEDIA_ROOT`` with ETag/Last-Modified validation and
+    byte-range support.
+
+    With ``MEDIA_SENDFILE_HEADER`` set the body is left to the front-end
+    server through ``X-Accel-Redirect`` (nginx) or ``X-Sendfile`` (Apache,
+    lighttpd). Otherwise whole files go out through ``FileResponse``, which
+    WSGI servers turn into a zero-copy ``sendfile``.
+    """
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        stat_result = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404("File not found.")
+    if not stat.S_ISREG(stat_result.st_mode):
+        raise Http404("File not found.")
+
+    size = stat_result.st_size
+    etag = quote_etag(f"{size:x}-{stat_result.st_mtime_ns:x}")
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(stat_result.st_mtime)
+    )
+    if response is None:
+        content_type, encoding = mimetypes.guess_type(full_path)
+        content_type = content_type or "application/octet-stream"
+        response = _file_response(request, path, full_path, size, etag, content_type)
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+
+    response.headers["ETag"] = etag
+    response.headers["Last-Modified"] = http_date(stat_result.st_mtime)
+    patch_cache_control(response, public=True, max_age=settings.MEDIA_CACHE_MAX_AGE)
+    return response
+
+
+def _file_response(request, path, full_path, size, etag, content_type):
+    header = settings.MEDIA_SENDFILE_HEADER
+    if header:
+        # The front-end server handles ranges itself
+        response = HttpResponse(content_type=content_type)
+        if header == "X-Accel-Redirect":
+            response.headers[header] = settings.MEDIA_ACCEL_REDIRECT_PREFIX + path
+        else:
+            response.headers[header] = full_path
+        return response
+
+    byte_range = None
+    if request.method == "GET" and "Range" in request.headers:
+        if_range = request.headers.get("If-Range")
+        if if_range is None or if_range == etag:
+            byte_range = parse_range(request.headers["Range"], size)
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response.headers["Content-Range"] = f"bytes */{size}"
+        return response
+
+    file = open(full_path, "rb")
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type)
+    else:
+        start, end = byte_range
+        response = FileResponse(
+            RangeFile(file, start, end - start + 1),
+            status=206,
+            content_type=content_type,
+        )
+        response.headers["Content-Length"] = str(end - start + 1)
+        response.headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response.headers["Accept-Ranges"] = "bytes"
+    return response
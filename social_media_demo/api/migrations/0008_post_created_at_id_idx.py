@@ -0,0 +1,19 @@
+# Generated by Django 5.0.7 on 2026-10-18 19:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0007_rename_commentmodel_comment_rename_likemodel_like_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["created_at", "id"], name="post_created_at_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.0.7 on 2026-10-18 19:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0009_feedentry"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PostCounterShard",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "field",
+                    models.CharField(
+                        choices=[
+                            ("comments_count", "Comments"),
+                            ("likes_count", "Likes"),
+                            ("shares_count", "Shares"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("shard", models.PositiveSmallIntegerField()),
+                ("value", models.IntegerField(default=0)),
+                (
+                    "post",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="counter_shards",
+                        to="api.post",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="postcountershard",
+            constraint=models.UniqueConstraint(
+                fields=("post", "field", "shard"), name="unique_post_counter_shard"
+            ),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.0.7 on 2026-10-18 19:04
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_friendships(apps, schema_editor):
+    FriendRequest = apps.get_model("api", "FriendRequest")
+    Friendship = apps.get_model("api", "Friendship")
+    accepted = FriendRequest.objects.filter(status="accepted").values_list(
+        "from_user_id", "to_user_id"
+    )
+    batch = []
+    for from_id, to_id in accepted.iterator(chunk_size=2000):
+        batch.append(Friendship(user_id=from_id, friend_id=to_id))
+        batch.append(Friendship(user_id=to_id, friend_id=from_id))
+        if len(batch) >= 2000:
+            Friendship.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    Friendship.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0010_postcountershard"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Friendship",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "friend",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="friend_of",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="friendships",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="friendship",
+            constraint=models.UniqueConstraint(
+                fields=("user", "friend"), name="unique_friendship"
+            ),
+        ),
+        migrations.RunPython(backfill_friendships, migrations.RunPython.noop),
+    ]
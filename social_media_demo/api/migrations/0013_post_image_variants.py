@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-18 19:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0012_friendsuggestion"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="image_variants",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.7 on 2026-10-18 19:08
+
+import api.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0013_post_image_variants"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MediaBlob",
+            fields=[
+                (
+                    "name",
+                    models.CharField(max_length=255, primary_key=True, serialize=False),
+                ),
+                ("refcount", models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name="post",
+            name="image",
+            field=models.ImageField(
+                blank=True,
+                null=True,
+                storage=api.storage.ContentAddressedStorage(),
+                upload_to="",
+            ),
+        ),
+    ]
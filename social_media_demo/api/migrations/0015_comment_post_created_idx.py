@@ -0,0 +1,19 @@
+# Generated by Django 5.0.7 on 2026-10-18 19:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0014_content_addressed_media"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["post", "created_at", "id"], name="comment_post_created_idx"
+            ),
+        ),
+    ]
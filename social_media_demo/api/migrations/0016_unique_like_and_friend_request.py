@@ -0,0 +1,56 @@
+# Generated by Django 5.0.7 on 2026-10-18 19:10
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remove_duplicates(apps, schema_editor):
+    """Keep one row per key so the unique constraints can be created."""
+    Like = apps.get_model("api", "Like")
+    FriendRequest = apps.get_model("api", "FriendRequest")
+
+    duplicate_likes = (
+        Like.objects.values("user", "post")
+        .annotate(keep=Min("id"), rows=Count("id"))
+        .filter(rows__gt=1)
+    )
+    for row in duplicate_likes.iterator():
+        Like.objects.filter(user=row["user"], post=row["post"]).exclude(
+            id=row["keep"]
+        ).delete()
+
+    # The most recently updated request reflects the current state
+    duplicate_requests = (
+        FriendRequest.objects.values("from_user", "to_user")
+        .annotate(rows=Count("id"))
+        .filter(rows__gt=1)
+    )
+    for row in duplicate_requests.iterator():
+        requests = FriendRequest.objects.filter(
+            from_user=row["from_user"], to_user=row["to_user"]
+        )
+        keep = requests.order_by("-updated_at", "-id").values_list("id", flat=True)
+        requests.exclude(id=keep.first()).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0015_comment_post_created_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="friendrequest",
+            constraint=models.UniqueConstraint(
+                fields=("from_user", "to_user"), name="unique_friend_request"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="like",
+            constraint=models.UniqueConstraint(
+                fields=("user", "post"), name="unique_like"
+            ),
+        ),
+    ]
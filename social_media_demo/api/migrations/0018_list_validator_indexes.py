@@ -0,0 +1,35 @@
+# Generated by Django 5.0.7 on 2026-10-18 19:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0017_notification"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="friendrequest",
+            index=models.Index(
+                condition=models.Q(("status", "pending")),
+                fields=["to_user", "updated_at"],
+                name="friendrequest_received_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="friendrequest",
+            index=models.Index(
+                condition=models.Q(("status", "pending")),
+                fields=["from_user", "updated_at"],
+                name="friendrequest_sent_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="friendship",
+            index=models.Index(
+                fields=["user", "created_at"], name="friendship_user_created_idx"
+            ),
+        ),
+    ]
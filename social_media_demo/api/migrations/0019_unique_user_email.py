@@ -0,0 +1,53 @@
+# Generated by Django 5.0.7 on 2026-10-18 19:33
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def check_duplicate_emails(apps, schema_editor):
+    """
+    Refuse to continue while emails differing only in case are shared.
+
+    Each duplicate is a separate account with its own posts and friends,
+    so they cannot be merged or dropped automatically.
+    """
+    CustomUser = apps.get_model("api", "CustomUser")
+    duplicates = (
+        CustomUser.objects.exclude(email="")
+        .values(normalized=Lower("email"))
+        .annotate(users=Count("id"))
+        .filter(users__gt=1)
+        .order_by("normalized")
+    )
+    emails = [row["normalized"] for row in duplicates]
+    if emails:
+        raise RuntimeError(
+            f"{len(emails)} email address(es) are used by more than one user "
+            f"(ignoring case): {', '.join(emails[:20])}"
+            f"{' ...' if len(emails) > 20 else ''}. Change or clear the email "
+            "of all but one account for each, e.g. with "
+            "CustomUser.objects.filter(email__iexact=...), then run migrate "
+            "again."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0018_list_validator_indexes"),
+        ("auth", "0012_alter_user_first_name_max_length"),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_emails, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="customuser",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.text.Lower("email"),
+                condition=models.Q(("email", ""), _negated=True),
+                name="unique_user_email",
+            ),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.0.7 on 2026-10-18 19:34
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_friend_counts(apps, schema_editor):
+    CustomUser = apps.get_model("api", "CustomUser")
+    Friendship = apps.get_model("api", "Friendship")
+    counts = (
+        Friendship.objects.filter(user_id=OuterRef("pk"))
+        .values("user_id")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    CustomUser.objects.update(friend_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0019_unique_user_email"),
+        ("auth", "0012_alter_user_first_name_max_length"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="customuser",
+            name="friend_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name="customuser",
+            index=models.Index(fields=["friend_count"], name="user_friend_count_idx"),
+        ),
+        migrations.RunPython(backfill_friend_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.0.7 on 2026-10-18 19:47
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def close_duplicate_rows(apps, schema_editor):
+    """Leave only the latest unread row per key taking new events."""
+    Notification = apps.get_model("api", "Notification")
+    duplicates = (
+        Notification.objects.filter(is_read=False)
+        .values("recipient", "kind", "post")
+        .annotate(rows=Count("id"))
+        .filter(rows__gt=1)
+    )
+    for row in duplicates.iterator():
+        rows = Notification.objects.filter(
+            recipient=row["recipient"],
+            kind=row["kind"],
+            post=row["post"],
+            is_read=False,
+        )
+        keep = rows.order_by("-updated_at", "-id").values_list("id", flat=True)
+        rows.exclude(id=keep.first()).update(coalescing=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0020_user_friend_count"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="coalescing",
+            field=models.BooleanField(default=True),
+        ),
+        migrations.RunPython(close_duplicate_rows, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="notification",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("coalescing", True), ("is_read", False)),
+                fields=("recipient", "kind", "post"),
+                name="unique_coalescing_notification",
+                nulls_distinct=False,
+            ),
+        ),
+    ]
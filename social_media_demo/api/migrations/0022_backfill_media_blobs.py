@@ -0,0 +1,44 @@
+# Generated by Django 5.0.7 on 2026-10-18 21:02
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def backfill_media_blobs(apps, schema_editor):
+    """
+    Count the posts using each stored image, including files uploaded before
+    0014_content_addressed_media, so deleting the last post removes the file.
+
+    Rows already created by uploads are set to the same count, which is
+    what they should hold.
+    """
+    MediaBlob = apps.get_model("api", "MediaBlob")
+    Post = apps.get_model("api", "Post")
+    counts = (
+        Post.objects.exclude(image="")
+        .exclude(image__isnull=True)
+        .values("image")
+        .annotate(posts=Count("id"))
+        .order_by()
+    )
+    MediaBlob.objects.bulk_create(
+        (
+            MediaBlob(name=row["image"], refcount=row["posts"])
+            for row in counts.iterator()
+        ),
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=["name"],
+        update_fields=["refcount"],
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0021_notification_coalescing"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_media_blobs, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,30 @@
 import uuid
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+from django.db.models.functions import Lower
+from api.storage import ContentAddressedStorage
 
 
 class CustomUser(AbstractUser):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # Denormalized from Friendship so the timeline can find high-fanout
+    # authors with one index range scan
+    friend_count = models.PositiveIntegerField(default=0)
+
+    class Meta(AbstractUser.Meta):
+        # The availability filter can miss users created by other processes,
+        # so uniqueness of emails is enforced here
+        constraints = [
+            models.UniqueConstraint(
+                Lower("email"),
+                condition=~models.Q(email=""),
+                name="unique_user_email",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["friend_count"], name="user_friend_count_idx"),
+        ]
 
 
 class FriendRequest(models.Model):
@@ -26,6 +46,94 @@ class FriendRequest(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["from_user", "to_user"], name="unique_friend_request"
+            ),
+        ]
+        # Cover the pending-request list validators in api.users.views
+        indexes = [
+            models.Index(
+                fields=["to_user", "updated_at"],
+                condition=models.Q(status="pending"),
+                name="friendrequest_received_idx",
+            ),
+            models.Index(
+                fields=["from_user", "updated_at"],
+                condition=models.Q(status="pending"),
+                name="friendrequest_sent_idx",
+            ),
+        ]
+
+
+class Friendship(models.Model):
+    """
+    One direction of an accepted friendship; both directions are stored.
+
+    Denormalized from accepted ``FriendRequest`` rows so that friend lookups
+    are a single index scan instead of an OR over both request directions.
+    """
+
+    user = models.ForeignKey(
+        CustomUser, related_name="friendships", on_delete=models.CASCADE
+    )
+    friend = models.ForeignKey(
+        CustomUser, related_name="friend_of", on_delete=models.CASCADE
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "friend"], name="unique_friendship"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "created_at"], name="friendship_user_created_idx"
+            ),
+        ]
+
+    @classmethod
+    def create_pair(cls, user_id, friend_id):
+        """Store both directions and count them, unless they already exist."""
+        # Both directions are always written together, so one conflict means
+        # the pair exists and the friend counts already include it
+        try:
+            with transaction.atomic():
+                cls.objects.bulk_create(
+                    [
+                        cls(user_id=user_id, friend_id=friend_id),
+                        cls(user_id=friend_id, friend_id=user_id),
+                    ]
+                )
+        except IntegrityError:
+            return
+        CustomUser.objects.filter(id__in=[user_id, friend_id]).update(
+            friend_count=F("friend_count") + 1
+        )
+
+
+class FriendSuggestion(models.Model):
+    """A precomputed "people you may know" candidate for ``user``."""
+
+    user = models.ForeignKey(
+        CustomUser, related_name="friend_suggestions", on_delete=models.CASCADE
+    )
+    suggested = models.ForeignKey(
+        CustomUser, related_name="+", on_delete=models.CASCADE
+    )
+    mutual_count = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "-mutual_count", "suggested"],
+                name="friendsuggestion_rank_idx",
+            ),
+        ]
+
 
 from django.db import models
 
@@ -33,34 +141,74 @@ from django.db import models
 class Post(models.Model):
     user = models.ForeignKey(CustomUser, related_name="posts", on_delete=models.CASCADE)
     caption = models.TextField(null=True, blank=True)
-    image = models.ImageField(null=True, blank=True)  # Ensure this line exists
+    image = models.ImageField(null=True, blank=True, storage=ContentAddressedStorage())
+    # Storage names of the resized WebP copies, filled in after upload
+    image_variants = models.JSONField(default=dict, blank=True)
     comments_count = models.PositiveIntegerField(default=0)
     likes_count = models.PositiveIntegerField(default=0)
     shares_count = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="post_created_at_id_idx"),
+        ]
+
     def __str__(self):
         return f"Post by {self.user.username} - {self.caption[:30]}"
 
+    # The counters below are updated with a single atomic UPDATE (or a shard
+    # row, see api.counters); the in-memory values are not refreshed.
+
     def increment_comments_count(self):
-        self.comments_count += 1
-        self.save()
+        from api.counters import increment_counter
+
+        increment_counter(self.pk, "comments_count", 1)
 
     def increment_shares_count(self):
-        self.shares_count += 1
-        self.save()
+        from api.counters import increment_counter
+
+        increment_counter(self.pk, "shares_count", 1)
 
     def increment_likes_count(self, action):
-        if action < 0 and self.likes_count == 0:
-            return
+        from api.counters import increment_counter
+
+        increment_counter(self.pk, "likes_count", action)
 
-        self.likes_count += action
-        self.likes_count = max(self.likes_count, 0)  # Prevent negative values
-        self.save()
 
+class PostCounterMixin:
+    """
+    Keep the ``counter_field`` of the related post in step with creation and
+    deletion of the row, inside the same transaction.
 
-class Comment(models.Model):
+    Bulk ``QuerySet`` writes bypass this and must adjust the counters
+    themselves; ``recount_post_counters`` repairs any drift.
+    """
+
+    counter_field = None
+
+    def save(self, *args, **kwargs):
+        from api.counters import increment_counter
+
+        creating = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if creating:
+                increment_counter(self.post_id, self.counter_field, 1)
+
+    def delete(self, *args, **kwargs):
+        from api.counters import increment_counter
+
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            # A concurrent delete of the same row may have removed it first
+            if result[0]:
+                increment_counter(self.post_id, self.counter_field, -1)
+        return result
+
+
+class Comment(PostCounterMixin, models.Model):
     post = models.ForeignKey(Post, related_name="comments", on_delete=models.CASCADE)
     user = models.ForeignKey(
         CustomUser, related_name="comments", on_delete=models.CASCADE
@@ -68,25 +216,177 @@ class Comment(models.Model):
     text = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    counter_field = "comments_count"
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["post", "created_at", "id"], name="comment_post_created_idx"
+            ),
+        ]
+
     def __str__(self):
         return f"Comment by {self.user.username} on {self.post.id}"
 
 
-class Share(models.Model):
+class Share(PostCounterMixin, models.Model):
     post = models.ForeignKey(Post, related_name="shares", on_delete=models.CASCADE)
     user = models.ForeignKey(
         CustomUser, related_name="shares", on_delete=models.CASCADE
     )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    counter_field = "shares_count"
+
     def __str__(self):
         return f"Share by {self.user.username} on {self.post.id}"
 
 
-class Like(models.Model):
+class Like(PostCounterMixin, models.Model):
     post = models.ForeignKey(Post, related_name="likes", on_delete=models.CASCADE)
     user = models.ForeignKey(CustomUser, related_name="likes", on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    counter_field = "likes_count"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "post"], name="unique_like"),
+        ]
+
     def __str__(self):
         return f"Like by {self.user.username} on {self.post.id}"
+
+
+class MediaBlob(models.Model):
+    """Reference count of a content-addressed file shared by identical uploads."""
+
+    name = models.CharField(max_length=255, primary_key=True)
+    refcount = models.PositiveIntegerField(default=0)
+
+    @classmethod
+    def acquire(cls, name):
+        """
+        Add one reference; return whether the row had to be created, in
+        which case a concurrent cleanup may just have removed the file.
+        """
+        if cls.objects.filter(name=name).update(refcount=F("refcount") + 1):
+            return False
+        _, created = cls.objects.get_or_create(name=name, defaults={"refcount": 1})
+        if not created:
+            cls.objects.filter(name=name).update(refcount=F("refcount") + 1)
+        return created
+
+    @classmethod
+    def release(cls, name):
+        """
+        Drop one reference; return whether the file is no longer used.
+
+        The row is kept at zero references so the cleanup can re-check it
+        under a lock, see ``api.posts.thumbnails.delete_unused_image``.
+        """
+        cls.objects.filter(name=name).update(refcount=F("refcount") - 1)
+        return cls.objects.filter(name=name, refcount=0).exists()
+
+
+class PostCounterShard(models.Model):
+    """One of ``POST_COUNTER_SHARDS`` partial sums of a hot ``Post`` counter."""
+
+    post = models.ForeignKey(
+        Post, related_name="counter_shards", on_delete=models.CASCADE
+    )
+    field = models.CharField(
+        max_length=20,
+        choices=[
+            ("comments_count", "Comments"),
+            ("likes_count", "Likes"),
+            ("shares_count", "Shares"),
+        ],
+    )
+    shard = models.PositiveSmallIntegerField()
+    # Signed, since a decrement may land on a different shard than the increment
+    value = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["post", "field", "shard"], name="unique_post_counter_shard"
+            ),
+        ]
+
+
+class FeedEntry(models.Model):
+    """A post materialized into the friends timeline of ``user``."""
+
+    user = models.ForeignKey(
+        CustomUser, related_name="feed_entries", on_delete=models.CASCADE
+    )
+    post = models.ForeignKey(
+        Post, related_name="feed_entries", on_delete=models.CASCADE
+    )
+    # Copied from the post so the timeline is a single index range scan
+    created_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "created_at", "post"], name="feedentry_user_created_idx"
+            ),
+        ]
+
+
+class Notification(models.Model):
+    """
+    Inbox entry folding every event of one ``kind`` on the same post (or,
+    for friend requests, with no post) into a single row while it is unread
+    and recent, e.g. "X and 12 others liked your post".
+    """
+
+    KIND_CHOICES = [
+        ("like", "Like"),
+        ("comment", "Comment"),
+        ("friend_request", "Friend request"),
+    ]
+
+    recipient = models.ForeignKey(
+        CustomUser, related_name="notifications", on_delete=models.CASCADE
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    post = models.ForeignKey(
+        Post, related_name="notifications", null=True, on_delete=models.CASCADE
+    )
+    last_actor = models.ForeignKey(
+        CustomUser, related_name="+", null=True, on_delete=models.SET_NULL
+    )
+    # Approximate: only repeats from last_actor are skipped, so an actor who
+    # comes back after someone else is counted again
+    actor_count = models.PositiveIntegerField(default=1)
+    is_read = models.BooleanField(default=False)
+    # Cleared once the row is older than NOTIFICATION_COALESCE_WINDOW and a
+    # new event starts a fresh row
+    coalescing = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        # At most one row per recipient, kind and post takes new events, so
+        # concurrent first events cannot insert two
+        constraints = [
+            models.UniqueConstraint(
+                fields=["recipient", "kind", "post"],
+                condition=models.Q(is_read=False, coalescing=True),
+                nulls_distinct=False,
+                name="unique_coalescing_notification",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["recipient", "-updated_at", "-id"],
+                name="notification_inbox_idx",
+            ),
+            models.Index(
+                fields=["recipient", "kind", "post"],
+                condition=models.Q(is_read=False),
+                name="notification_unread_idx",
+            ),
+        ]
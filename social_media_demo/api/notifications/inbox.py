@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, When
+from django.utils import timezone
+from api.models import Notification
+
+
+def notify(recipient_id, kind, actor, post_id=None):
+    """
+    Record that ``actor`` did ``kind`` for ``recipient_id``.
+
+    The event is folded into the recipient's unread notification for the
+    same kind and post when that was updated within
+    ``NOTIFICATION_COALESCE_WINDOW`` seconds, so a burst of likes on one post
+    keeps updating one row instead of inserting a row per like.
+    """
+    if recipient_id is None or recipient_id == actor.id:
+        return
+    now = timezone.now()
+    window_start = now - timedelta(seconds=settings.NOTIFICATION_COALESCE_WINDOW)
+    open_rows = Notification.objects.filter(
+        recipient_id=recipient_id,
+        kind=kind,
+        post_id=post_id,
+        is_read=False,
+        coalescing=True,
+    )
+    # The unique constraint on open rows lets only one concurrent first event
+    # insert; the others fail and fold into its row on the next attempt
+    for _ in range(2):
+        updated = open_rows.filter(updated_at__gte=window_start).update(
+            # Repeated events from the latest actor, e.g. like, unlike, like,
+            # are not counted again
+            actor_count=Case(
+                When(last_actor=actor, then=F("actor_count")),
+                default=F("actor_count") + 1,
+            ),
+            last_actor=actor,
+            updated_at=now,
+        )
+        if updated:
+            return
+        try:
+            with transaction.atomic():
+                open_rows.filter(updated_at__lt=window_start).update(coalescing=False)
+                Notification.objects.create(
+                    recipient_id=recipient_id,
+                    kind=kind,
+                    post_id=post_id,
+                    last_actor=actor,
+                    updated_at=now,
+                )
+            return
+        except IntegrityError:
+            continue
+
+
+def unread_count(user_id):
+    return Notification.objects.filter(recipient_id=user_id, is_read=False).count()
@@ -0,0 +1,37 @@
+from rest_framework import serializers
+from api.models import Notification
+
+
+class NotificationSerializer(serializers.ModelSerializer):
+    last_actor = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Notification
+        fields = [
+            "id",
+            "kind",
+            "post",
+            "last_actor",
+            "actor_count",
+            "is_read",
+            "updated_at",
+        ]
+
+    def get_last_actor(self, obj):
+        if obj.last_actor is None:
+            return None
+        return {"id": obj.last_actor.id, "username": obj.last_actor.username}
+
+
+class MarkNotificationsReadSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, max_length=500
+    )
+
+    def save(self):
+        notifications = Notification.objects.filter(
+            recipient=self.context["request"].user, is_read=False
+        )
+        if "ids" in self.validated_data:
+            notifications = notifications.filter(id__in=self.validated_data["ids"])
+        return notifications.update(is_read=True)
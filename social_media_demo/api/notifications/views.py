@@ -0,0 +1,45 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import permissions
+from api.authentication import JWTTokenUserAuthentication
+from api.models import Notification
+from api.pagination import NotificationPagination
+from .inbox import unread_count
+from .serializers import MarkNotificationsReadSerializer, NotificationSerializer
+
+
+class NotificationListView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        paginator = NotificationPagination()
+        notifications = paginator.paginate_queryset(
+            Notification.objects.filter(recipient=request.user).select_related(
+                "last_actor"
+            ),
+            request,
+            view=self,
+        )
+        serializer = NotificationSerializer(notifications, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+
+class UnreadNotificationCountView(APIView):
+    authentication_classes = [JWTTokenUserAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        return Response({"unread_count": unread_count(request.user.id)}, status=200)
+
+
+class MarkNotificationsReadView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = MarkNotificationsReadSerializer(
+            data=request.data, context={"request": request}
+        )
+        if serializer.is_valid():
+            updated = serializer.save()
+            return Response({"updated": updated}, status=200)
+        return Response(serializer.errors, status=400)
@@ -0,0 +1,144 @@
+import base64
+import json
+from functools import reduce
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def keyset_filter(ordering, values):
+    """
+    Build the filter selecting rows strictly after ``values`` in ``ordering``.
+
+    For ordering ``("-created_at", "-id")`` and values ``(c, i)`` this is
+    ``created_at <= c AND (created_at < c OR (created_at = c AND id < i))``.
+    The leading bound lets the database range-scan the composite index.
+    """
+    names = [field.lstrip("-") for field in ordering]
+    clauses = []
+    for index, field in enumerate(ordering):
+        lookup = "lt" if field.startswith("-") else "gt"
+        equal = {name: value for name, value in zip(names[:index], values)}
+        clauses.append(Q(**equal, **{f"{names[index]}__{lookup}": values[index]}))
+    lead = "lte" if ordering[0].startswith("-") else "gte"
+    return Q(**{f"{names[0]}__{lead}": values[0]}) & reduce(Q.__or__, clauses)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over a unique, composite ordering.
+
+    The cursor is an opaque token holding the ordering values of the last row
+    of the previous page, so every page is a bounded index range scan no
+    matter how deep the client has scrolled.
+    """
+
+    ordering = ("-created_at", "-id")
+    page_size = 20
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def decode_cursor(self, request, model):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            raw = json.loads(base64.urlsafe_b64decode(token.encode()).decode())
+            if len(raw) != len(self.ordering):
+                raise ValueError
+            return [
+                model._meta.get_field(field.lstrip("-")).to_python(value)
+                for field, value in zip(self.ordering, raw)
+            ]
+        except Exception:
+            raise NotFound("Invalid cursor.")
+
+    def encode_cursor(self, values):
+        raw = json.dumps([str(value) for value in values], separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def get_row_values(self, row):
+        names = [field.lstrip("-") for field in self.ordering]
+        if isinstance(row, dict):
+            return [row[name] for name in names]
+        return [getattr(row, name) for name in names]
+
+    def start(self, request, model):
+        """Read the page size and return the decoded cursor position."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        return self.decode_cursor(request, model)
+
+    def get_page_queryset(self, queryset, request):
+        """Return ``queryset`` limited to the requested page plus one row."""
+        position = self.start(request, queryset.model)
+        queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            queryset = queryset.filter(keyset_filter(self.ordering, position))
+        return queryset[: self.page_size + 1]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.paginate_rows(list(self.get_page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        page = self.get_page_queryset(queryset, request)
+        return self.paginate_rows([row async for row in page])
+
+    def paginate_rows(self, rows):
+        """Trim an over-fetched, already ordered list of rows to one page."""
+        self.has_next = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        self.next_values = self.get_row_values(rows[-1]) if self.has_next else None
+        return rows
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.next_values)
+        )
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+class PostFeedPagination(KeysetPagination):
+    ordering = ("-created_at", "-id")
+
+
+class CommentPagination(KeysetPagination):
+    ordering = ("-created_at", "-id")
+
+
+class UserListPagination(KeysetPagination):
+    ordering = ("username", "id")
+
+
+class FriendSuggestionPagination(KeysetPagination):
+    ordering = ("-mutual_count", "suggested_id")
+
+
+class NotificationPagination(KeysetPagination):
+    ordering = ("-updated_at", "-id")
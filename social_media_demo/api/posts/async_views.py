@@ -0,0 +1,50 @@
+from rest_framework import permissions
+from rest_framework.response import Response
+from api.counters import counter_shard_sums
+from api.models import Comment, Post
+from api.pagination import CommentPagination, PostFeedPagination
+from api.views import AsyncAPIView
+from .serializers import PostCommentSerializer, PostSerializer, aliked_post_ids
+
+
+class AsyncPostFeedView(AsyncAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    async def get(self, request):
+        paginator = PostFeedPagination()
+        posts = await paginator.apaginate_queryset(
+            Post.objects.select_related("user").annotate(**counter_shard_sums()),
+            request,
+            view=self,
+        )
+        serializer = PostSerializer(
+            posts,
+            many=True,
+            context={
+                "request": request,
+                "liked_post_ids": await aliked_post_ids(
+                    request.user, [post.id for post in posts]
+                ),
+            },
+        )
+        return paginator.get_paginated_response(serializer.data)
+
+
+class AsyncPostCommentListView(AsyncAPIView):
+    async def get(self, request):
+        post_id = request.query_params.get("post_id")
+        if not post_id or not post_id.isdigit():
+            return Response({"message": "Missing post_id in request query."}, 400)
+
+        paginator = CommentPagination()
+        comments = await paginator.apaginate_queryset(
+            Comment.objects.filter(post_id=post_id).select_related("user"),
+            request,
+            view=self,
+        )
+        serializer = PostCommentSerializer(
+            comments,
+            many=True,
+            context={"request": request},
+        )
+        return paginator.get_paginated_response(serializer.data)
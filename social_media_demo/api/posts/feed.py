@@ -0,0 +1,103 @@
+import heapq
+from itertools import islice
+
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+from api.counters import counter_shard_sums
+from api.models import CustomUser, FeedEntry, Friendship, Post
+from api.pagination import keyset_filter
+from api.users.friends import friend_ids
+
+ENTRY_ORDERING = ("-created_at", "-post_id")
+POST_ORDERING = ("-created_at", "-id")
+
+
+def fan_out_post(post):
+    """
+    Write ``post`` into the timeline of its author and each of their friends.
+
+    Authors above ``FEED_FANOUT_LIMIT`` only get their own entry; their
+    friends pick the post up in ``read_timeline`` instead. Both sides decide
+    from ``CustomUser.friend_count``.
+    """
+    friend_count = (
+        CustomUser.objects.filter(id=post.user_id)
+        .values_list("friend_count", flat=True)
+        .get()
+    )
+    if friend_count > settings.FEED_FANOUT_LIMIT:
+        recipients = set()
+    else:
+        # Read from Friendship rather than the friend graph cache, which can
+        # lag in other processes; a missed entry is never repaired later
+        recipients = set(
+            Friendship.objects.filter(user_id=post.user_id).values_list(
+                "friend_id", flat=True
+            )
+        )
+    recipients.add(post.user_id)
+    FeedEntry.objects.bulk_create(
+        [
+            FeedEntry(user_id=user_id, post=post, created_at=post.created_at)
+            for user_id in recipients
+        ],
+        batch_size=1000,
+    )
+
+
+def high_fanout_friend_ids(user_id):
+    """Return the friends of ``user_id`` whose posts are not fanned out."""
+    # Few users are over the limit, so the range scan on friend_count is
+    # small and is intersected with the cached friend set
+    high_fanout = CustomUser.objects.filter(
+        friend_count__gt=settings.FEED_FANOUT_LIMIT
+    ).values_list("id", flat=True)
+    friends = friend_ids(user_id)
+    return [author_id for author_id in high_fanout if author_id in friends]
+
+
+def read_timeline(user_id, position, limit):
+    """
+    Return up to ``limit`` timeline posts after the keyset ``position``.
+
+    ``position`` is a ``(created_at, post id)`` pair or ``None`` for the
+    first page. Posts by high-fanout friends are read from ``Post`` and
+    merged with the materialized entries, skipping any that were fanned out
+    to the user before their author crossed ``FEED_FANOUT_LIMIT``.
+    """
+    shard_sums = counter_shard_sums("post")
+    entries = (
+        FeedEntry.objects.filter(user_id=user_id)
+        .select_related("post__user")
+        .annotate(**shard_sums)
+    )
+    if position is not None:
+        entries = entries.filter(keyset_filter(ENTRY_ORDERING, position))
+    posts = []
+    for entry in entries.order_by(*ENTRY_ORDERING)[:limit]:
+        # The shard sums are annotated on the entry but read from the post
+        for name in shard_sums:
+            setattr(entry.post, name, getattr(entry, name))
+        posts.append(entry.post)
+
+    pulled_from = high_fanout_friend_ids(user_id)
+    if pulled_from:
+        fanned_out = FeedEntry.objects.filter(
+            user_id=user_id, created_at=OuterRef("created_at"), post=OuterRef("pk")
+        )
+        pulled = (
+            Post.objects.filter(user_id__in=pulled_from)
+            .filter(~Exists(fanned_out))
+            .select_related("user")
+            .annotate(**counter_shard_sums())
+        )
+        if position is not None:
+            pulled = pulled.filter(keyset_filter(POST_ORDERING, position))
+        merged = heapq.merge(
+            posts,
+            pulled.order_by(*POST_ORDERING)[:limit],
+            key=lambda post: (post.created_at, post.id),
+            reverse=True,
+        )
+        posts = list(islice(merged, limit))
+    return posts
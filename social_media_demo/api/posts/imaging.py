@@ -0,0 +1,39 @@
+"""
+Image resizing run inside the worker processes of ``api.posts.thumbnails``.
+
+This module is imported by freshly spawned workers, so it must not depend on
+Django being configured.
+"""
+
+import os
+
+from PIL import Image, ImageOps
+
+
+def variant_name(image_name, variant):
+    """Return the storage name of ``variant`` for the image ``image_name``."""
+    stem, _ = os.path.splitext(image_name)
+    return f"variants/{stem}/{variant}.webp"
+
+
+def render_variants(source_path, media_root, image_name, sizes, quality):
+    """
+    Write a WebP copy of the image no larger than each of ``sizes``.
+
+    ``sizes`` maps variant names to their maximum width/height in pixels.
+    Returns a mapping of variant names to storage names.
+    """
+    names = {}
+    with Image.open(source_path) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+        for variant, size in sizes.items():
+            name = variant_name(image_name, variant)
+            path = os.path.join(media_root, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            resized = image.copy()
+            resized.thumbnail((size, size), Image.Resampling.LANCZOS)
+            resized.save(path, "WEBP", quality=quality, method=4)
+            names[variant] = name
+    return names
@@ -1,10 +1,43 @@
+from django.conf import settings
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
+from api.counters import apply_counter_deltas, counter_value
+from api.events import publish_event, user_summary
 from api.models import Post, Like, Comment, Share
+from api.notifications.inbox import notify
+from api.response_cache import bump_versions
+from api.values_serializers import ValuesSerializer
+
+
+def liked_post_ids(user, post_ids):
+    """Return which of ``post_ids`` are liked by ``user`` using a single query."""
+    if not user.is_authenticated:
+        return set()
+    return set(
+        Like.objects.filter(user=user, post_id__in=post_ids).values_list(
+            "post_id", flat=True
+        )
+    )
+
+
+async def aliked_post_ids(user, post_ids):
+    """Async version of ``liked_post_ids``."""
+    if not user.is_authenticated:
+        return set()
+    liked = Like.objects.filter(user=user, post_id__in=post_ids).values_list(
+        "post_id", flat=True
+    )
+    return {post_id async for post_id in liked}
 
 
 class PostSerializer(serializers.ModelSerializer):
     username = serializers.SerializerMethodField()
     is_liked_by_user = serializers.SerializerMethodField()
+    image_variants = serializers.SerializerMethodField()
+    # Include the shard sums annotated by api.counters.counter_shard_sums
+    comments_count = serializers.SerializerMethodField()
+    likes_count = serializers.SerializerMethodField()
+    shares_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Post
@@ -15,6 +48,7 @@ class PostSerializer(serializers.ModelSerializer):
             "caption",
             "is_liked_by_user",
             "image",
+            "image_variants",
             "comments_count",
             "likes_count",
             "shares_count",
@@ -23,9 +57,6 @@ class PostSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = [
             "user",
-            "comments_count",
-            "likes_count",
-            "shares_count",
             "created_at",
             "updated_at",
         ]
@@ -33,15 +64,46 @@ class PostSerializer(serializers.ModelSerializer):
     def get_username(self, obj):
         return obj.user.username
 
+    def get_comments_count(self, obj):
+        return counter_value(obj, "comments_count")
+
+    def get_likes_count(self, obj):
+        return counter_value(obj, "likes_count")
+
+    def get_shares_count(self, obj):
+        return counter_value(obj, "shares_count")
+
     def get_is_liked_by_user(self, obj):
         # Ensure the user is passed in context
         request = self.context.get("request")
         if not request or not request.user.is_authenticated:
             return False
 
+        # List views precompute the liked IDs for the whole page
+        liked_ids = self.context.get("liked_post_ids")
+        if liked_ids is not None:
+            return obj.id in liked_ids
+
         user = request.user
         return Like.objects.filter(post=obj, user=user).exists()
 
+    def get_image_variants(self, obj):
+        if not obj.image:
+            return None
+        # Variants are rendered in the background; serve a placeholder until then
+        if not obj.image_variants:
+            return dict.fromkeys(
+                settings.POST_IMAGE_VARIANTS, settings.POST_IMAGE_PLACEHOLDER
+            )
+
+        request = self.context.get("request")
+        storage = obj.image.storage
+        variants = {}
+        for variant, name in obj.image_variants.items():
+            url = storage.url(name)
+            variants[variant] = request.build_absolute_uri(url) if request else url
+        return variants
+
     def validate(self, data):
         caption = data.get("caption")
         image = data.get("image")
@@ -54,6 +116,75 @@ class PostSerializer(serializers.ModelSerializer):
         return data
 
 
+class PostValuesSerializer(ValuesSerializer):
+    """Output of ``PostSerializer`` built from ``.values()`` rows."""
+
+    fields = (
+        ("id", "id"),
+        ("user", "user_id"),
+        ("username", "user__username"),
+        ("caption", "caption"),
+        ("is_liked_by_user", None),
+        ("image", None),
+        ("image_variants", None),
+        ("comments_count", None),
+        ("likes_count", None),
+        ("shares_count", None),
+        ("created_at", "created_at"),
+        ("updated_at", "updated_at"),
+    )
+    datetime_fields = ("created_at", "updated_at")
+    # Rows may also carry the shard sums of api.counters.counter_shard_sums
+    extra_lookups = (
+        "image",
+        "image_variants",
+        "comments_count",
+        "likes_count",
+        "shares_count",
+    )
+
+    def __init__(self, context=None, prefix=""):
+        super().__init__(context, prefix)
+        request = self.context.get("request")
+        if request is not None and request.user.is_authenticated:
+            self.liked_ids = self.context["liked_post_ids"]
+        else:
+            self.liked_ids = set()
+        self.storage = Post.image.field.storage
+        self.image_url = (
+            (lambda name: request.build_absolute_uri(self.storage.url(name)))
+            if request is not None
+            else self.storage.url
+        )
+
+    def get_is_liked_by_user(self, row):
+        return row["id"] in self.liked_ids
+
+    def get_comments_count(self, row):
+        return counter_value(row, "comments_count")
+
+    def get_likes_count(self, row):
+        return counter_value(row, "likes_count")
+
+    def get_shares_count(self, row):
+        return counter_value(row, "shares_count")
+
+    def get_image(self, row):
+        return self.image_url(row["image"]) if row["image"] else None
+
+    def get_image_variants(self, row):
+        if not row["image"]:
+            return None
+        if not row["image_variants"]:
+            return dict.fromkeys(
+                settings.POST_IMAGE_VARIANTS, settings.POST_IMAGE_PLACEHOLDER
+            )
+        return {
+            variant: self.image_url(name)
+            for variant, name in row["image_variants"].items()
+        }
+
+
 class PostCommentSerializer(serializers.ModelSerializer):
     username = serializers.SerializerMethodField()
 
@@ -79,4 +210,105 @@ class PostCommentSerializer(serializers.ModelSerializer):
             post=post,
             text=text,
         )
+        bump_versions("posts")
+        notify(post.user_id, "comment", user, post_id=post.id)
+        if post.user_id != user.id:
+            publish_event(
+                post.user_id,
+                "comment",
+                {"post_id": post.id, "user": user_summary(user), "text": text},
+            )
         return comment
+
+
+class PostCommentValuesSerializer(ValuesSerializer):
+    """Output of ``PostCommentSerializer`` built from ``.values()`` rows."""
+
+    fields = (
+        ("text", "text"),
+        ("post", "post_id"),
+        ("username", "user__username"),
+    )
+
+
+class LikeActionSerializer(serializers.Serializer):
+    post_id = serializers.IntegerField()
+    liked = serializers.BooleanField()
+
+
+class BulkLikeSerializer(serializers.Serializer):
+    actions = LikeActionSerializer(many=True, allow_empty=False, max_length=500)
+
+    def insert_likes(self, user, post_ids):
+        """Insert the likes and return the post IDs whose like was inserted."""
+        likes = [Like(user=user, post_id=post_id) for post_id in post_ids]
+        try:
+            with transaction.atomic():
+                Like.objects.bulk_create(likes)
+            return post_ids
+        except IntegrityError:
+            pass
+        # A concurrent request liked one of the posts first; insert them one
+        # by one so only the likes actually written are counted
+        inserted = set()
+        for like in likes:
+            try:
+                with transaction.atomic():
+                    Like.objects.bulk_create([like])
+            except IntegrityError:
+                continue
+            inserted.add(like.post_id)
+        return inserted
+
+    def save(self):
+        user = self.context["request"].user
+        actions = self.validated_data["actions"]
+        # The last action on a post wins, as if they were replayed in order
+        wanted = {action["post_id"]: action["liked"] for action in actions}
+
+        with transaction.atomic():
+            authors = dict(
+                Post.objects.filter(id__in=wanted).values_list("id", "user_id")
+            )
+            found = set(authors)
+            # Locking the existing likes keeps a concurrent toggle from
+            # deleting one before the DELETE below, which would then remove
+            # fewer rows than it is counted for
+            liked = set(
+                Like.objects.select_for_update()
+                .filter(user=user, post_id__in=found)
+                .order_by("post_id")
+                .values_list("post_id", flat=True)
+            )
+            to_like = {post_id for post_id in found if wanted[post_id]} - liked
+            to_unlike = {post_id for post_id in found if not wanted[post_id]} & liked
+
+            to_like = self.insert_likes(user, to_like)
+            Like.objects.filter(user=user, post_id__in=to_unlike).delete()
+            deltas = dict.fromkeys(to_like, 1) | dict.fromkeys(to_unlike, -1)
+            apply_counter_deltas("likes_count", deltas)
+            if deltas:
+                bump_versions("posts")
+
+        for post_id in sorted(to_like):
+            author_id = authors[post_id]
+            notify(author_id, "like", user, post_id=post_id)
+            if author_id != user.id:
+                publish_event(
+                    author_id, "like", {"post_id": post_id, "user": user_summary(user)}
+                )
+
+        changed = to_like | to_unlike
+        results = []
+        for action in actions:
+            post_id = action["post_id"]
+            if post_id not in found:
+                status = "not_found"
+            elif post_id in changed:
+                status = "updated"
+            else:
+                status = "unchanged"
+            results.append(
+                {"post_id": post_id, "liked": wanted[post_id], "status": status}
+            )
+        return results
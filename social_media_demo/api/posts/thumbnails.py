@@ -0,0 +1,87 @@
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from api.models import MediaBlob, Post
+from api.response_cache import bump_versions
+from .imaging import render_variants, variant_name
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        # Spawned workers do not inherit the parent's threads or DB connections
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_WORKER_PROCESSES,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def schedule_variants(post):
+    """Render the image variants of ``post`` once the current transaction commits."""
+    if post.image:
+        transaction.on_commit(partial(submit_variants, post.pk, post.image.name))
+
+
+def submit_variants(post_id, image_name):
+    future = get_executor().submit(
+        render_variants,
+        Post.image.field.storage.path(image_name),
+        settings.MEDIA_ROOT,
+        image_name,
+        settings.POST_IMAGE_VARIANTS,
+        settings.POST_IMAGE_QUALITY,
+    )
+    future.add_done_callback(partial(_store_variants, post_id))
+    return future
+
+
+def _store_variants(post_id, future):
+    try:
+        variants = future.result()
+        Post.objects.filter(pk=post_id).update(image_variants=variants)
+        bump_versions("posts")
+    except Exception:
+        logger.exception("Failed to render image variants for post %s", post_id)
+    finally:
+        close_old_connections()
+
+
+def delete_image_files(image_name):
+    """Delete an image and its rendered variants from storage."""
+    storage = Post.image.field.storage
+    storage.delete(image_name)
+    for variant in settings.POST_IMAGE_VARIANTS:
+        storage.delete(variant_name(image_name, variant))
+
+
+def delete_unused_image(image_name):
+    """Delete an image's files unless it was acquired again since its release."""
+    with transaction.atomic():
+        # The row stays locked until the files are gone, so a concurrent
+        # MediaBlob.acquire() waits and then recreates the row, which tells
+        # the upload to write the file back
+        blob = (
+            MediaBlob.objects.select_for_update()
+            .filter(name=image_name, refcount=0)
+            .first()
+        )
+        if blob is None:
+            return
+        delete_image_files(image_name)
+        blob.delete()
+
+
+def restore_image(image_name, upload):
+    """Write ``upload`` back under ``image_name`` if a cleanup removed it."""
+    storage = Post.image.field.storage
+    if not storage.exists(image_name):
+        storage.save(image_name, upload)
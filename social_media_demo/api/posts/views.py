@@ -1,9 +1,64 @@
+from functools import partial
+
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import permissions
 from rest_framework.parsers import MultiPartParser, FormParser
-from api.models import Post, Like, Comment
-from .serializers import PostSerializer, PostCommentSerializer
+from api.conditional import conditional, make_etag
+from api.counters import (
+    COUNTER_FIELDS,
+    counter_shard_sums,
+    counter_value,
+    increment_counter,
+)
+from api.events import publish_event, user_summary
+from api.models import MediaBlob, Post, Like, Comment
+from api.notifications.inbox import notify
+from api.pagination import CommentPagination, PostFeedPagination
+from api.response_cache import bump_versions, cache_response
+from .feed import fan_out_post, read_timeline
+from .thumbnails import delete_unused_image, restore_image, schedule_variants
+from .serializers import (
+    BulkLikeSerializer,
+    PostCommentSerializer,
+    PostCommentValuesSerializer,
+    PostSerializer,
+    PostValuesSerializer,
+    liked_post_ids,
+)
+
+FEED_ETAG_FIELDS = ("id", "updated_at", "image_variants")
+
+
+def feed_etag_row(post, liked):
+    """Return what ``PostSerializer`` shows of a post row that can change."""
+    return (
+        *(post[field] for field in FEED_ETAG_FIELDS),
+        *(counter_value(post, field) for field in COUNTER_FIELDS),
+        liked,
+    )
+
+
+def feed_etag(request):
+    # The columns PostSerializer shows for each post of the page and whether
+    # the user liked it, in one narrow query without the user join
+    paginator = PostFeedPagination()
+    rows = list(
+        paginator.get_page_queryset(
+            Post.objects.annotate(
+                liked=Exists(
+                    Like.objects.filter(user=request.user, post=OuterRef("pk"))
+                )
+            ),
+            request,
+        ).values(*FEED_ETAG_FIELDS, *COUNTER_FIELDS, "liked", **counter_shard_sums())
+    )
+    rows = [feed_etag_row(row, row["liked"]) for row in rows]
+    return make_etag(
+        request, rows[: paginator.page_size], len(rows) > paginator.page_size
+    )
 
 
 class CreatePostView(APIView):
@@ -13,18 +68,55 @@ class CreatePostView(APIView):
     def post(self, request):
         serializer = PostSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save(user=request.user)  # Assign the current user to the post
+            with transaction.atomic():
+                # Assign the current user to the post
+                post = serializer.save(user=request.user)
+                if post.image and MediaBlob.acquire(post.image.name):
+                    restore_image(post.image.name, serializer.validated_data["image"])
+                fan_out_post(post)
+                schedule_variants(post)
+                bump_versions("posts")
             return Response({"message": "new post created successfully"}, 201)
         return Response(serializer.errors, 400)
 
+    @conditional(feed_etag)
+    @cache_response("posts")
+    def get(self, request):
+        paginator = PostFeedPagination()
+        posts = paginator.paginate_queryset(
+            Post.objects.values(
+                *PostValuesSerializer.lookups(), **counter_shard_sums()
+            ),
+            request,
+            view=self,
+        )
+        liked = liked_post_ids(request.user, [post["id"] for post in posts])
+        serializer = PostValuesSerializer(
+            context={"request": request, "liked_post_ids": liked}
+        )
+        return paginator.get_paginated_response(serializer.serialize(posts))
+
+
+class FriendsTimelineView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
     def get(self, request):
-        posts = Post.objects.all().order_by("-created_at")
+        paginator = PostFeedPagination()
+        position = paginator.start(request, Post)
+        posts = paginator.paginate_rows(
+            read_timeline(request.user.id, position, paginator.page_size + 1)
+        )
         serializer = PostSerializer(
             posts,
             many=True,
-            context={"request": request},
+            context={
+                "request": request,
+                "liked_post_ids": liked_post_ids(
+                    request.user, [post.id for post in posts]
+                ),
+            },
         )
-        return Response(serializer.data, 200)
+        return paginator.get_paginated_response(serializer.data)
 
 
 class DeletePostView(APIView):
@@ -36,7 +128,16 @@ class DeletePostView(APIView):
             try:
                 post = Post.objects.get(id=post_id)
                 if post.user == request.user:
-                    post.delete()
+                    with transaction.atomic():
+                        image_name = post.image.name
+                        post.delete()
+                        bump_versions("posts")
+                        # Identical uploads share one file; only remove it
+                        # once the last post using it is gone
+                        if image_name and MediaBlob.release(image_name):
+                            transaction.on_commit(
+                                partial(delete_unused_image, image_name)
+                            )
                     return Response({"message": "Post deleted successfully"}, 200)
                 else:
                     return Response(
@@ -51,19 +152,56 @@ class DeletePostView(APIView):
 class ToggleLikeAPIView(APIView):
     def post(self, request):
         post_id = request.data.get("post_id")
-        post = Post.objects.get(id=post_id)
+        if not post_id or not str(post_id).isdigit():
+            return Response({"message": "Missing post_id in request data."}, 400)
         user = request.user
 
-        like = Like.objects.filter(user=user, post=post).first()
-        if like:
-            like.delete()
-            post.increment_likes_count(-1)
-            return Response({"message": "Like removed."}, 200)
-        else:
-            Like.objects.create(user=user, post=post)
-            post.increment_likes_count(1)
+        # Unlike is one conditional DELETE and like is one INSERT guarded by
+        # the unique (user, post) constraint, each followed by the counter
+        # UPDATE; no SELECT is needed to find out which way to toggle.
+        try:
+            with transaction.atomic():
+                deleted, _ = Like.objects.filter(user=user, post_id=post_id).delete()
+                if deleted:
+                    increment_counter(post_id, "likes_count", -deleted)
+                else:
+                    # Like.save() bumps likes_count
+                    Like.objects.create(user=user, post_id=post_id)
+                bump_versions("posts")
+        except IntegrityError:
+            # Either the post does not exist or a concurrent request liked it
+            if not Post.objects.filter(id=post_id).exists():
+                return Response({"message": "Post not found."}, 404)
             return Response({"message": "Post liked."}, 201)
 
+        if deleted:
+            return Response({"message": "Like removed."}, 200)
+
+        author_id = (
+            Post.objects.filter(id=post_id).values_list("user_id", flat=True).first()
+        )
+        notify(author_id, "like", user, post_id=post_id)
+        if author_id != user.id:
+            publish_event(
+                author_id, "like", {"post_id": int(post_id), "user": user_summary(user)}
+            )
+        return Response({"message": "Post liked."}, 201)
+
+
+class BulkLikeAPIView(APIView):
+    """Apply a batch of queued like/unlike actions from a client."""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = BulkLikeSerializer(
+            data=request.data,
+            context={"request": request},
+        )
+        if serializer.is_valid():
+            return Response({"results": serializer.save()}, 200)
+        return Response(serializer.errors, 400)
+
 
 class PostCommentView(APIView):
     def post(self, request):
@@ -77,10 +215,17 @@ class PostCommentView(APIView):
         return Response(serializer.errors, 400)
 
     def get(self, request):
-        comment = Comment.objects.all().order_by("-created_at")
-        serializer = PostCommentSerializer(
-            comment,
-            many=True,
-            context={"request": request},
+        post_id = request.query_params.get("post_id")
+        if not post_id or not post_id.isdigit():
+            return Response({"message": "Missing post_id in request query."}, 400)
+
+        paginator = CommentPagination()
+        comments = paginator.paginate_queryset(
+            Comment.objects.filter(post_id=post_id).values(
+                "id", "created_at", *PostCommentValuesSerializer.lookups()
+            ),
+            request,
+            view=self,
         )
-        return Response(serializer.data, 200)
+        serializer = PostCommentValuesSerializer(context={"request": request})
+        return paginator.get_paginated_response(serializer.serialize(comments))
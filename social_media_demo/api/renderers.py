@@ -0,0 +1,51 @@
+import orjson
+from rest_framework import renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.utils import encoders
+
+# Types orjson does not encode natively (lazy translations, Decimal,
+# timedelta, querysets, ...) fall back to DRF's encoder
+_fallback = encoders.JSONEncoder().default
+
+
+class ORJSONRenderer(renderers.JSONRenderer):
+    """
+    Drop-in ``JSONRenderer`` encoding with orjson, which handles UUIDs,
+    datetimes and dicts in native code.
+
+    Compact output is byte-identical to ``JSONRenderer``; indented output,
+    e.g. for the browsable API, is left to ``JSONRenderer``.
+    """
+
+    options = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=_fallback, option=self.options)
+        # Escape U+2028/U+2029 like JSONRenderer so the output stays a
+        # strict JavaScript subset
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+                b"\xe2\x80\xa9", b"\\u2029"
+            )
+        return ret
+
+
+class ORJSONParser(BaseParser):
+    """Parses JSON request bodies with orjson."""
+
+    media_type = "application/json"
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
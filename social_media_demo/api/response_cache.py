@@ -0,0 +1,131 @@
+import hashlib
+import threading
+import time
+from collections import Counter
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+# Cached responses are keyed by the current version of every scope they
+# depend on, e.g. "posts" or "friends:<user id>". A write bumps the version,
+# which makes every older entry unreachable without finding or deleting it;
+# the backend's size-bounded eviction reclaims them.
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def _cache():
+    return caches[settings.RESPONSE_CACHE]
+
+
+def _version_key(scope):
+    return f"response-version:{scope}"
+
+
+def _new_version():
+    # A fresh version after the counter was evicted must never match one
+    # that was already used, so versions start from the clock
+    return time.time_ns()
+
+
+def get_versions(scopes):
+    keys = [_version_key(scope) for scope in scopes]
+    versions = _cache().get_many(keys)
+    for key in keys:
+        if key not in versions:
+            _cache().add(key, _new_version(), None)
+            versions[key] = _cache().get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_versions(*scopes):
+    """Invalidate the responses depending on ``scopes`` once the transaction commits."""
+
+    def bump():
+        for scope in scopes:
+            try:
+                _cache().incr(_version_key(scope))
+            except ValueError:
+                _cache().set(_version_key(scope), _new_version(), None)
+
+    transaction.on_commit(bump)
+
+
+def record(view_name, outcome):
+    with _stats_lock:
+        _stats[view_name, outcome] += 1
+
+
+def response_cache_stats():
+    """Return ``{view name: {"hit": n, "miss": n}}`` for this process."""
+    with _stats_lock:
+        stats = {}
+        for (view_name, outcome), count in _stats.items():
+            stats.setdefault(view_name, {"hit": 0, "miss": 0})[outcome] = count
+        return stats
+
+
+def cache_response(*scopes):
+    """
+    Cache a GET handler's successful responses per user and query string.
+
+    ``scopes`` are format strings given the request's ``user_id``, so
+    ``"friends:{user_id}"`` ties the response to that user's friend list.
+
+    The handler must sit under ``conditional``: the ETag it computes for the
+    request is part of the key and is stored with the body, so a cached body
+    is only ever served with the validator it was built under. A write on
+    another process changes that validator and misses the cache even though
+    the version bump only reached that process's cache. Requests without a
+    validator are not cached.
+    """
+
+    def decorator(handler):
+        view_name = handler.__qualname__
+
+        @wraps(handler)
+        def wrapper(self, request, *args, **kwargs):
+            validator = getattr(request, "etag", None)
+            if validator is None:
+                return handler(self, request, *args, **kwargs)
+
+            user_id = request.user.id
+            versions = get_versions([scope.format(user_id=user_id) for scope in scopes])
+            query = hashlib.md5(request.get_full_path().encode()).hexdigest()
+            key = ":".join(
+                ["response", view_name, str(user_id), query, validator]
+                + [str(version) for version in versions]
+            )
+
+            cached = _cache().get(key)
+            if cached is not None:
+                record(view_name, "hit")
+                status, data, etag = cached
+                response = Response(data, status=status)
+                if etag:
+                    response.headers["ETag"] = etag
+                response.headers["X-Cache"] = "HIT"
+                return response
+
+            record(view_name, "miss")
+            response = handler(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                _cache().set(
+                    key,
+                    (
+                        response.status_code,
+                        response.data,
+                        response.get("ETag", validator),
+                    ),
+                    settings.RESPONSE_CACHE_TIMEOUT,
+                )
+            response.headers["X-Cache"] = "MISS"
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,35 @@
+from django.db.models import F
+from django.core.signals import request_started
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from api.authentication import user_cache
+from api.models import CustomUser
+from api.users.availability import availability_index
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_cached_user(sender, instance, **kwargs):
+    # Covers deactivation and password changes, which are saved through
+    # the model; queryset.update() bypasses this and relies on the TTL
+    user_cache.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=CustomUser)
+def add_user_to_availability_index(sender, instance, **kwargs):
+    availability_index.add_user(instance)
+
+
+@receiver(request_started)
+def start_availability_index(sender, **kwargs):
+    # Built off the request path once the process serves traffic, so that
+    # management commands such as migrate never stream the user table
+    availability_index.start()
+
+
+@receiver(pre_delete, sender=CustomUser)
+def uncount_deleted_friend(sender, instance, **kwargs):
+    # The user's Friendship rows are about to be cascade-deleted
+    CustomUser.objects.filter(friendships__friend_id=instance.pk).update(
+        friend_count=F("friend_count") - 1
+    )
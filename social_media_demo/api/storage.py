@@ -0,0 +1,54 @@
+import hashlib
+import os
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File storage naming each file after the SHA-256 of its contents.
+
+    Uploads are streamed to a temporary file while being hashed and then moved
+    to ``ab/cd/abcd...ef.ext``, so directories stay small and identical uploads
+    share one file. Reference counts live in ``api.models.MediaBlob``.
+    """
+
+    incoming_dir = ".incoming"
+
+    def get_available_name(self, name, max_length=None):
+        # The final name is only known once the content has been hashed, and
+        # an existing file with that name already holds the same bytes
+        return name
+
+    def hashed_name(self, digest, extension):
+        return f"{digest[:2]}/{digest[2:4]}/{digest}{extension}"
+
+    def _save(self, name, content):
+        incoming = self.path(self.incoming_dir)
+        os.makedirs(incoming, exist_ok=True)
+        descriptor, temp_path = tempfile.mkstemp(dir=incoming)
+        try:
+            digest = hashlib.sha256()
+            with os.fdopen(descriptor, "wb") as temp_file:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+
+            extension = os.path.splitext(name)[1].lower()
+            name = self.hashed_name(digest.hexdigest(), extension)
+            path = self.path(name)
+            if os.path.exists(path):
+                os.unlink(temp_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                if self.file_permissions_mode is not None:
+                    os.chmod(temp_path, self.file_permissions_mode)
+                os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+        return name
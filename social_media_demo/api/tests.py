@@ -1,3 +1,227 @@
-from django.test import TestCase
+import threading
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import AnonymousUser
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from api.counters import CounterBuffer
+from api.models import Comment, CustomUser, FriendRequest, Like, Post
+from api.posts.serializers import (
+    PostCommentSerializer,
+    PostCommentValuesSerializer,
+    PostSerializer,
+    PostValuesSerializer,
+    liked_post_ids,
+)
+from api.renderers import ORJSONRenderer
+from api.users.serializers import (
+    GetFriendRequestSerializer,
+    GetFriendRequestValuesSerializer,
+    GetSentFriendRequestSerializer,
+    GetSentFriendRequestValuesSerializer,
+    UserSerializer,
+    UserValuesSerializer,
+)
+
+
+class PostFeedQueryCountTest(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create(username="viewer")
+        author = CustomUser.objects.create(username="author")
+        posts = [
+            Post.objects.create(user=author, caption=f"post {i}") for i in range(60)
+        ]
+        for post in posts[::2]:
+            Like.objects.create(user=self.user, post=post)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def fetch(self, page_size):
+        response = self.client.get("/create-post", {"page_size": page_size})
+        self.assertEqual(response.status_code, 200)
+        return response.data["results"]
+
+    def test_query_count_is_constant_in_page_size(self):
+        # One narrow query for the ETag, one for the page (authors joined
+        # in) and one for the likes
+        with self.assertNumQueries(3):
+            small = self.fetch(5)
+        with self.assertNumQueries(3):
+            large = self.fetch(50)
+
+        self.assertEqual(len(small), 5)
+        self.assertEqual(len(large), 50)
+
+    def test_is_liked_by_user_matches_likes(self):
+        liked = set(
+            Like.objects.filter(user=self.user).values_list("post_id", flat=True)
+        )
+        for post in self.fetch(50):
+            self.assertEqual(post["is_liked_by_user"], post["id"] in liked)
+
+
+class CounterBufferTest(TestCase):
+    def setUp(self):
+        author = CustomUser.objects.create(username="author")
+        self.posts = [
+            Post.objects.create(user=author, caption=str(i)) for i in range(3)
+        ]
+        # A long interval keeps the background flusher out of the test
+        self.buffer = CounterBuffer("likes_count", interval=3600)
+
+    def test_concurrent_deltas_are_not_lost(self):
+        def like_storm(post):
+            for _ in range(500):
+                self.buffer.add(post.id, 1)
+            for _ in range(100):
+                self.buffer.add(post.id, -1)
+
+        threads = [
+            threading.Thread(target=like_storm, args=(post,))
+            for post in self.posts
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        # Flush while the storm is still running
+        while any(thread.is_alive() for thread in threads):
+            self.buffer.flush()
+        for thread in threads:
+            thread.join()
+        self.buffer.flush()
+
+        for post in self.posts:
+            post.refresh_from_db()
+            self.assertEqual(post.likes_count, 4 * 400)
+
+    def test_failed_flush_keeps_deltas(self):
+        self.buffer.add(self.posts[0].id, 3)
+        with mock.patch("api.counters.write_counter", side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                self.buffer.flush()
+        self.buffer.flush()
+
+        self.posts[0].refresh_from_db()
+        self.assertEqual(self.posts[0].likes_count, 3)
+
+    @override_settings(LIKES_COUNT_WRITE_BEHIND=True)
+    def test_increment_is_buffered(self):
+        with mock.patch("api.counters.like_buffer", self.buffer):
+            self.posts[0].increment_likes_count(1)
+            self.posts[0].refresh_from_db()
+            self.assertEqual(self.posts[0].likes_count, 0)
+
+            self.buffer.flush()
+            self.posts[0].refresh_from_db()
+            self.assertEqual(self.posts[0].likes_count, 1)
+
+
+class ValuesSerializerOutputTest(TestCase):
+    """The values serializers must render the same bytes as their models'."""
+
+    def setUp(self):
+        self.viewer = CustomUser.objects.create(username="viewer", first_name="v")
+        author = CustomUser.objects.create(username="author", last_name="a")
+        Post.objects.create(user=author, caption="text only", likes_count=3)
+        # Variants not rendered yet, so the placeholders are served
+        Post.objects.create(user=author, image="ab/cd/pending.png")
+        liked = Post.objects.create(
+            user=self.viewer,
+            caption="with variants",
+            image="ab/cd/done.png",
+            image_variants={"thumbnail": "ab/cd/done-thumbnail.webp"},
+            comments_count=2,
+        )
+        Like.objects.create(user=self.viewer, post=liked)
+        Comment.objects.create(user=author, post=liked, text="first")
+        Comment.objects.create(user=self.viewer, post=liked, text="")
+        for user in (author, CustomUser.objects.create(username="other")):
+            FriendRequest.objects.create(from_user=user, to_user=self.viewer)
+        FriendRequest.objects.create(from_user=self.viewer, to_user=author)
+
+    def request(self, user):
+        request = Request(APIRequestFactory().get("/create-post"))
+        request.user = user
+        return request
+
+    def render(self, data):
+        return ORJSONRenderer().render(data)
+
+    def assertPostsRenderEqual(self, request):
+        posts = list(Post.objects.select_related("user").order_by("id"))
+        rows = list(Post.objects.values(*PostValuesSerializer.lookups()).order_by("id"))
+        context = {"request": request}
+        if request is not None:
+            context["liked_post_ids"] = liked_post_ids(
+                request.user, [post.id for post in posts]
+            )
+
+        expected = self.render(PostSerializer(posts, many=True, context=context).data)
+        actual = self.render(PostValuesSerializer(context).serialize(rows))
+        self.assertEqual(actual, expected)
+
+    def test_posts_for_authenticated_viewer(self):
+        self.assertPostsRenderEqual(self.request(self.viewer))
+
+    def test_posts_for_anonymous_viewer(self):
+        self.assertPostsRenderEqual(self.request(AnonymousUser()))
+
+    def test_posts_without_request(self):
+        self.assertPostsRenderEqual(None)
+
+    def test_friend_requests(self):
+        received = FriendRequest.objects.filter(to_user=self.viewer).order_by("id")
+
+        expected = self.render(
+            GetFriendRequestSerializer(
+                received.select_related("from_user"), many=True
+            ).data
+        )
+        actual = self.render(
+            GetFriendRequestValuesSerializer().serialize(
+                received.values(*GetFriendRequestValuesSerializer.lookups())
+            )
+        )
+        self.assertEqual(actual, expected)
+
+    def test_sent_friend_requests(self):
+        sent = FriendRequest.objects.filter(from_user=self.viewer).order_by("id")
+
+        expected = self.render(
+            GetSentFriendRequestSerializer(
+                sent.select_related("to_user"), many=True
+            ).data
+        )
+        actual = self.render(
+            GetSentFriendRequestValuesSerializer().serialize(
+                sent.values(*GetSentFriendRequestValuesSerializer.lookups())
+            )
+        )
+        self.assertEqual(actual, expected)
+
+    def test_comments(self):
+        comments = Comment.objects.order_by("id")
+
+        expected = self.render(
+            PostCommentSerializer(comments.select_related("user"), many=True).data
+        )
+        actual = self.render(
+            PostCommentValuesSerializer().serialize(
+                comments.values(*PostCommentValuesSerializer.lookups())
+            )
+        )
+        self.assertEqual(actual, expected)
+
+    def test_users(self):
+        users = CustomUser.objects.order_by("username")
+
+        expected = self.render(UserSerializer(users, many=True).data)
+        actual = self.render(
+            UserValuesSerializer().serialize(
+                users.values(*UserValuesSerializer.lookups())
+            )
+        )
+        self.assertEqual(actual, expected)
@@ -1,15 +1,26 @@
 from django.contrib import admin
 from django.urls import path
+from .notifications.views import (
+    MarkNotificationsReadView,
+    NotificationListView,
+    UnreadNotificationCountView,
+)
 from .posts.views import (
+    BulkLikeAPIView,
     CreatePostView,
     DeletePostView,
+    FriendsTimelineView,
     PostCommentView,
     ToggleLikeAPIView,
 )
-from .views import HealthCheckView
+from .posts.async_views import AsyncPostCommentListView, AsyncPostFeedView
+from .views import EventStreamView, HealthCheckView
+from .users.async_views import AsyncGetFriendListView, AsyncGetFriendRequestListView
 from .users.views import (
+    AvailabilityView,
     CancelFriendRequestView,
     FriendRequestActionView,
+    FriendSuggestionListView,
     GetAllUserView,
     GetFriendListView,
     GetFriendRequestListView,
@@ -20,8 +31,10 @@ from .users.views import (
 
 urlpatterns = [
     path("health-check", HealthCheckView.as_view(), name="health-check"),
+    path("events", EventStreamView.as_view(), name="events"),
     path("signup", SignUpView.as_view(), name="signup"),
     path("login", LoginView.as_view(), name="login"),
+    path("availability", AvailabilityView.as_view(), name="availability"),
     path(
         "friend-request/send",
         SentFriendRequestView.as_view(),
@@ -48,8 +61,43 @@ urlpatterns = [
         name="friend-list",
     ),
     path("all-users", GetAllUserView.as_view(), name="all-users"),
+    path(
+        "friend-suggestions",
+        FriendSuggestionListView.as_view(),
+        name="friend-suggestions",
+    ),
     path("create-post", CreatePostView.as_view(), name="create-post"),
+    path("timeline", FriendsTimelineView.as_view(), name="timeline"),
     path("delete-post", DeletePostView.as_view(), name="delete-post"),
     path("like-post", ToggleLikeAPIView.as_view(), name="like-post"),
+    path("like-posts", BulkLikeAPIView.as_view(), name="like-posts"),
     path("comment-post", PostCommentView.as_view(), name="comment-post"),
+    # Native async versions of the read endpoints, for ASGI deployments
+    path("async/create-post", AsyncPostFeedView.as_view(), name="async-feed"),
+    path(
+        "async/comment-post",
+        AsyncPostCommentListView.as_view(),
+        name="async-comment-post",
+    ),
+    path(
+        "async/friend-request",
+        AsyncGetFriendRequestListView.as_view(),
+        name="async-friend-request",
+    ),
+    path(
+        "async/friend-list",
+        AsyncGetFriendListView.as_view(),
+        name="async-friend-list",
+    ),
+    path("notifications", NotificationListView.as_view(), name="notifications"),
+    path(
+        "notifications/unread-count",
+        UnreadNotificationCountView.as_view(),
+        name="unread-notification-count",
+    ),
+    path(
+        "notifications/read",
+        MarkNotificationsReadView.as_view(),
+        name="read-notifications",
+    ),
 ]
@@ -0,0 +1,38 @@
+from rest_framework import permissions
+from rest_framework.response import Response
+from api.authentication import JWTTokenUserAuthentication
+from api.models import CustomUser, FriendRequest
+from api.views import AsyncAPIView
+from .friends import afriend_ids
+from .serializers import GetFriendRequestSerializer, UserSerializer
+
+
+class AsyncGetFriendRequestListView(AsyncAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    async def get(self, request):
+        received_requests = FriendRequest.objects.filter(
+            to_user=request.user,
+            status="pending",
+        ).select_related("from_user")
+        received_requests = [
+            friend_request async for friend_request in received_requests
+        ]
+        serializer = GetFriendRequestSerializer(received_requests, many=True)
+        return Response(
+            {"count": len(received_requests), "friend_requests": serializer.data},
+            status=200,
+        )
+
+
+class AsyncGetFriendListView(AsyncAPIView):
+    authentication_classes = [JWTTokenUserAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    async def get(self, request):
+        friend_ids = await afriend_ids(request.user.id)
+        friend_users = CustomUser.objects.filter(id__in=friend_ids)
+        serializer = UserSerializer(
+            [friend async for friend in friend_users], many=True
+        )
+        return Response(serializer.data, status=200)
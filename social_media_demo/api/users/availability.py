@@ -0,0 +1,165 @@
+import hashlib
+import logging
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+from api.models import CustomUser
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """
+    Set membership with no false negatives and a false-positive rate of about
+    ``error_rate`` while holding at most ``capacity`` values.
+    """
+
+    def __init__(self, capacity, error_rate):
+        capacity = max(capacity, 1)
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hash_count = max(round(self.size / capacity * math.log(2)), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        # Double hashing: the i-th position is h1 + i * h2
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(value)
+        )
+
+
+class AvailabilityIndex:
+    """
+    Bloom filter of every lowercase username and email, so checking a name
+    that is not taken needs no query.
+
+    A background thread, started by the first request the process serves,
+    builds the filter from a streamed ``values_list`` and rebuilds it every
+    ``USER_FILTER_REFRESH_INTERVAL`` seconds, which resizes it and picks up
+    users created by other processes. Requests keep using the previous
+    filter meanwhile and fall back to the database until the first build
+    lands. Users saved in this process are added immediately by
+    ``api.signals``.
+
+    The filter is per process, so until the next rebuild a miss can be wrong
+    for users created elsewhere. Misses are only advisory: logins are left to
+    ``authenticate()`` and unique constraints reject duplicate signups.
+    """
+
+    def __init__(self):
+        self.filter = None
+        self.lock = threading.Lock()
+        self.thread = None
+        self.rebuilding = False
+        self.added_during_rebuild = []
+
+    def _keys(self, username, email):
+        keys = [f"username:{username.lower()}"]
+        if email:
+            keys.append(f"email:{email.lower()}")
+        return keys
+
+    def _build(self):
+        capacity = CustomUser.objects.count() * 2
+        bloom = BloomFilter(
+            int(max(capacity, 1000) * settings.USER_FILTER_HEADROOM),
+            settings.USER_FILTER_ERROR_RATE,
+        )
+        rows = CustomUser.objects.values_list("username", "email").iterator(
+            chunk_size=5000
+        )
+        for username, email in rows:
+            for key in self._keys(username, email):
+                bloom.add(key)
+        return bloom
+
+    def start(self):
+        """Start the background thread building and refreshing the filter."""
+        if self.thread is not None:
+            return
+        with self.lock:
+            if self.thread is not None:
+                return
+            self.thread = threading.Thread(
+                target=self._run, name="availability-filter", daemon=True
+            )
+            self.thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                self.rebuild()
+            except Exception:
+                logger.exception("Failed to build the availability filter")
+            finally:
+                close_old_connections()
+            time.sleep(settings.USER_FILTER_REFRESH_INTERVAL)
+
+    def rebuild(self):
+        """Build a fresh filter and swap it in."""
+        with self.lock:
+            self.rebuilding = True
+        try:
+            bloom = self._build()
+            with self.lock:
+                # Users saved while the rows were streamed may have been missed
+                for key in self.added_during_rebuild:
+                    bloom.add(key)
+                self.filter = bloom
+        finally:
+            with self.lock:
+                self.rebuilding = False
+                self.added_during_rebuild = []
+
+    def might_contain(self, kind, value):
+        bloom = self.filter
+        if bloom is None:
+            self.start()
+            # Not built yet, so the caller has to ask the database
+            return True
+        return f"{kind}:{value.lower()}" in bloom
+
+    def add_user(self, user):
+        keys = self._keys(user.username, user.email)
+        with self.lock:
+            if self.rebuilding:
+                self.added_during_rebuild.extend(keys)
+            if self.filter is not None:
+                for key in keys:
+                    self.filter.add(key)
+
+
+availability_index = AvailabilityIndex()
+
+
+def username_taken(username):
+    """
+    Return whether ``username`` is taken, querying only on a filter hit.
+    A ``False`` may be stale for users created by other processes.
+    """
+    if not availability_index.might_contain("username", username):
+        return False
+    return CustomUser.objects.filter(username=username).exists()
+
+
+def email_taken(email):
+    """
+    Return whether ``email`` is taken, querying only on a filter hit.
+    A ``False`` may be stale for users created by other processes.
+    """
+    if not availability_index.might_contain("email", email):
+        return False
+    return CustomUser.objects.filter(email__iexact=email).exists()
@@ -0,0 +1,112 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Q
+from api.models import FriendRequest, Friendship
+
+# Each user's friend and pending-request IDs are cached as one sorted bytes
+# string of packed 16-byte UUIDs, which is compact to store and can be
+# binary-searched without unpacking. Invalidation only reaches the cache the
+# write went through, so with a per-process cache the sets may lag by up to
+# FRIEND_GRAPH_CACHE_TIMEOUT in other processes.
+UUID_SIZE = 16
+
+
+def _cache():
+    return caches[settings.FRIEND_GRAPH_CACHE]
+
+
+def _cache_key(kind, user_id):
+    return f"friend-graph:{kind}:{user_id}"
+
+
+def _pack(user_ids):
+    return b"".join(sorted(user_id.bytes for user_id in user_ids))
+
+
+def _unpack(packed):
+    return {
+        uuid.UUID(bytes=packed[start : start + UUID_SIZE])
+        for start in range(0, len(packed), UUID_SIZE)
+    }
+
+
+def _contains(packed, user_id):
+    target = user_id.bytes
+    low, high = 0, len(packed) // UUID_SIZE
+    while low < high:
+        middle = (low + high) // 2
+        candidate = packed[middle * UUID_SIZE : (middle + 1) * UUID_SIZE]
+        if candidate < target:
+            low = middle + 1
+        elif candidate > target:
+            high = middle
+        else:
+            return True
+    return False
+
+
+def _load_friends(user_id):
+    return Friendship.objects.filter(user_id=user_id).values_list(
+        "friend_id", flat=True
+    )
+
+
+def _load_pending(user_id):
+    pairs = FriendRequest.objects.filter(
+        Q(from_user_id=user_id) | Q(to_user_id=user_id),
+        status="pending",
+    ).values_list("from_user_id", "to_user_id")
+    return {to_id if from_id == user_id else from_id for from_id, to_id in pairs}
+
+
+def _get_packed(kind, user_id, load):
+    key = _cache_key(kind, user_id)
+    packed = _cache().get(key)
+    if packed is None:
+        packed = _pack(load(user_id))
+        _cache().set(key, packed, settings.FRIEND_GRAPH_CACHE_TIMEOUT)
+    return packed
+
+
+async def _aget_packed(kind, user_id, load):
+    key = _cache_key(kind, user_id)
+    packed = await _cache().aget(key)
+    if packed is None:
+        packed = _pack([row async for row in load(user_id)])
+        await _cache().aset(key, packed, settings.FRIEND_GRAPH_CACHE_TIMEOUT)
+    return packed
+
+
+def friend_ids(user_id):
+    """Return the set of friend IDs of ``user_id``."""
+    return _unpack(_get_packed("friends", user_id, _load_friends))
+
+
+async def afriend_ids(user_id):
+    """Async version of ``friend_ids``."""
+    return _unpack(await _aget_packed("friends", user_id, _load_friends))
+
+
+def pending_ids(user_id):
+    """Return the IDs of users with a pending request to or from ``user_id``."""
+    return _unpack(_get_packed("pending", user_id, _load_pending))
+
+
+def are_friends(user_id, other_id):
+    """Return whether ``user_id`` and ``other_id`` are friends."""
+    return _contains(_get_packed("friends", user_id, _load_friends), other_id)
+
+
+def invalidate_friend_graph(*user_ids, friends=False):
+    """
+    Drop the cached pending (and, with ``friends``, friend) IDs of users.
+
+    Deletion is deferred until the surrounding transaction commits so that a
+    concurrent read cannot re-cache the pre-commit state.
+    """
+    kinds = ["pending", "friends"] if friends else ["pending"]
+    keys = [_cache_key(kind, user_id) for kind in kinds for user_id in user_ids]
+    transaction.on_commit(lambda: _cache().delete_many(keys))
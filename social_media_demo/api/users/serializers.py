@@ -1,8 +1,15 @@
 from rest_framework import serializers
 import re
-from api.models import CustomUser, FriendRequest
+from django.db import transaction
+from api.models import CustomUser, FriendRequest, FriendSuggestion, Friendship
 from django.db.models import Q
 from django.contrib.auth import authenticate
+from api.events import publish_event, user_summary
+from api.notifications.inbox import notify
+from api.response_cache import bump_versions
+from api.values_serializers import ValuesSerializer
+from .availability import email_taken, username_taken
+from .friends import are_friends, invalidate_friend_graph
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -11,6 +18,17 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ["id", "username", "first_name", "last_name"]
 
 
+class UserValuesSerializer(ValuesSerializer):
+    """Output of ``UserSerializer`` built from ``.values()`` rows."""
+
+    fields = (
+        ("id", "id"),
+        ("username", "username"),
+        ("first_name", "first_name"),
+        ("last_name", "last_name"),
+    )
+
+
 class SignUpSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, style={"input_type": "password"})
     confirm_password = serializers.CharField(
@@ -29,12 +47,12 @@ class SignUpSerializer(serializers.ModelSerializer):
         ]
 
     def validate_email(self, value):
-        if CustomUser.objects.filter(email=value).exists():
+        if email_taken(value):
             raise serializers.ValidationError("A user with this email already exists.")
         return value
 
     def validate_username(self, value):
-        if CustomUser.objects.filter(username=value).exists():
+        if username_taken(value):
             raise serializers.ValidationError(
                 "A user with this username already exists."
             )
@@ -77,18 +95,20 @@ class LoginSerializer(serializers.Serializer):
     username = serializers.CharField(max_length=255)
     password = serializers.CharField(write_only=True)
 
-    def validate_username(self, value):
-        if not CustomUser.objects.filter(username=value).exists():
-            raise serializers.ValidationError("Username not found.")
-        return value
-
     def validate(self, data):
+        # authenticate() runs first so a successful login costs no extra
+        # query; the availability filter is never trusted to reject a login,
+        # as it can miss users created by other processes
         username = data.get("username")
         password = data.get("password")
 
         if username and password:
             user = authenticate(username=username, password=password)
             if not user:
+                if not CustomUser.objects.filter(username=username).exists():
+                    raise serializers.ValidationError(
+                        {"username": ["Username not found."]}
+                    )
                 raise serializers.ValidationError("Invalid username or password.")
         else:
             raise serializers.ValidationError(
@@ -115,26 +135,28 @@ class SentFriendRequestSerializer(serializers.ModelSerializer):
                 "You cannot send a friend request to yourself."
             )
 
-        if FriendRequest.objects.filter(
-            Q(from_user=from_user, to_user=to_user, status="accepted")
-            | Q(to_user=from_user, from_user=to_user, status="accepted")
-        ).exists():
+        if are_friends(from_user.id, to_user.id):
             raise serializers.ValidationError("Already friends.")
 
-        if (
-            FriendRequest.objects.filter(from_user=from_user, to_user=to_user)
-            .exclude(Q(status="cancelled") | Q(status="rejected"))
-            .exists()
-        ):
+        # One query fetches the request state in both directions
+        statuses = dict(
+            FriendRequest.objects.filter(
+                Q(from_user=from_user, to_user=to_user)
+                | Q(from_user=to_user, to_user=from_user)
+            ).values_list("from_user_id", "status")
+        )
+        sent = statuses.get(from_user.id)
+        received = statuses.get(to_user.id)
+
+        if "accepted" in (sent, received):
+            raise serializers.ValidationError("Already friends.")
+
+        if sent == "pending":
             raise serializers.ValidationError(
                 "Friend request already sent to this user."
             )
 
-        if (
-            FriendRequest.objects.filter(from_user=to_user, to_user=from_user)
-            .exclude(Q(status="cancelled") | Q(status="rejected"))
-            .exists()
-        ):
+        if received == "pending":
             raise serializers.ValidationError(
                 "This user has already sent you a friend request."
             )
@@ -146,21 +168,21 @@ class SentFriendRequestSerializer(serializers.ModelSerializer):
         from_user = request.user
         to_user = validated_data.get("to_user")
 
-        existing_request = FriendRequest.objects.filter(
-            from_user=from_user, to_user=to_user
-        ).first()
-
-        if existing_request:
-            existing_request.status = "pending"
-            existing_request.save()
-            return existing_request
-        else:
-            friend_request = FriendRequest.objects.create(
-                from_user=from_user,
-                to_user=to_user,
-                status="pending",
-            )
-            return friend_request
+        # A single INSERT ... ON CONFLICT reopens a cancelled or rejected
+        # request instead of a SELECT followed by an INSERT or UPDATE
+        (friend_request,) = FriendRequest.objects.bulk_create(
+            [FriendRequest(from_user=from_user, to_user=to_user, status="pending")],
+            update_conflicts=True,
+            unique_fields=["from_user", "to_user"],
+            update_fields=["status", "updated_at"],
+        )
+        invalidate_friend_graph(from_user.id, to_user.id)
+        bump_versions(f"friend-requests:{to_user.id}")
+        notify(to_user.id, "friend_request", from_user)
+        publish_event(
+            to_user.id, "friend_request", {"from_user": user_summary(from_user)}
+        )
+        return friend_request
 
 
 class GetSentFriendRequestSerializer(serializers.ModelSerializer):
@@ -179,6 +201,26 @@ class GetFriendRequestSerializer(serializers.ModelSerializer):
         fields = ["from_user", "status"]
 
 
+class GetSentFriendRequestValuesSerializer(ValuesSerializer):
+    """Output of ``GetSentFriendRequestSerializer`` built from ``.values()`` rows."""
+
+    fields = (("to_user", UserValuesSerializer), ("status", "status"))
+
+
+class GetFriendRequestValuesSerializer(ValuesSerializer):
+    """Output of ``GetFriendRequestSerializer`` built from ``.values()`` rows."""
+
+    fields = (("from_user", UserValuesSerializer), ("status", "status"))
+
+
+class FriendSuggestionSerializer(serializers.ModelSerializer):
+    user = UserSerializer(source="suggested", read_only=True)
+
+    class Meta:
+        model = FriendSuggestion
+        fields = ["user", "mutual_count"]
+
+
 class CancelFriendRequestSerializer(serializers.ModelSerializer):
     class Meta:
         model = FriendRequest
@@ -205,8 +247,11 @@ class CancelFriendRequestSerializer(serializers.ModelSerializer):
         ).first()
 
         if existing_request:
-            existing_request.status = "cancelled"
-            existing_request.save()
+            with transaction.atomic():
+                existing_request.status = "cancelled"
+                existing_request.save()
+                invalidate_friend_graph(from_user.id, to_user.id)
+                bump_versions(f"friend-requests:{to_user.id}")
             return existing_request
 
 
@@ -248,10 +293,28 @@ class FriendRequestActionSerializer(serializers.Serializer):
             raise serializers.ValidationError("No pending friend request found.")
 
         if action == "accept":
-            friend_request.status = "accepted"
-            friend_request.save()
+            with transaction.atomic():
+                friend_request.status = "accepted"
+                friend_request.save()
+                Friendship.create_pair(friend_request.from_user_id, current_user.id)
+                invalidate_friend_graph(
+                    friend_request.from_user_id, current_user.id, friends=True
+                )
+                bump_versions(
+                    f"friend-requests:{current_user.id}",
+                    f"friends:{current_user.id}",
+                    f"friends:{friend_request.from_user_id}",
+                )
         elif action == "reject":
-            friend_request.status = "rejected"
-            friend_request.save()
-
+            with transaction.atomic():
+                friend_request.status = "rejected"
+                friend_request.save()
+                invalidate_friend_graph(friend_request.from_user_id, current_user.id)
+                bump_versions(f"friend-requests:{current_user.id}")
+
+        publish_event(
+            friend_request.from_user_id,
+            f"friend_request_{friend_request.status}",
+            {"user": user_summary(current_user)},
+        )
         return friend_request
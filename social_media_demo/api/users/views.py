@@ -1,21 +1,51 @@
 from rest_framework_simplejwt.tokens import RefreshToken
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Exists, Max, OuterRef
 from rest_framework.generics import ListAPIView
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import authentication, permissions
-from api.models import CustomUser, FriendRequest
+from api.authentication import JWTTokenUserAuthentication
+from api.conditional import conditional, make_etag
+from api.models import CustomUser, FriendRequest, FriendSuggestion, Friendship
+from api.pagination import FriendSuggestionPagination, UserListPagination
+from api.response_cache import cache_response
 from .serializers import (
     CancelFriendRequestSerializer,
     FriendRequestActionSerializer,
-    GetFriendRequestSerializer,
-    GetSentFriendRequestSerializer,
+    FriendSuggestionSerializer,
+    GetFriendRequestValuesSerializer,
+    GetSentFriendRequestValuesSerializer,
     LoginSerializer,
     SentFriendRequestSerializer,
     SignUpSerializer,
     UserSerializer,
+    UserValuesSerializer,
 )
-from django.db.models import Q
+from .availability import email_taken, username_taken
+
+
+# Each validator counts and takes the max of one indexed column, so the
+# aggregate is answered from the index alone
+def friend_list_etag(request):
+    aggregate = Friendship.objects.filter(user_id=request.user.id).aggregate(
+        count=Count("created_at"), latest=Max("created_at")
+    )
+    return make_etag(request, aggregate["count"], aggregate["latest"])
+
+
+def received_requests_etag(request):
+    aggregate = FriendRequest.objects.filter(
+        to_user_id=request.user.id, status="pending"
+    ).aggregate(count=Count("updated_at"), latest=Max("updated_at"))
+    return make_etag(request, aggregate["count"], aggregate["latest"])
+
+
+def sent_requests_etag(request):
+    aggregate = FriendRequest.objects.filter(
+        from_user_id=request.user.id, status="pending"
+    ).aggregate(count=Count("updated_at"), latest=Max("updated_at"))
+    return make_etag(request, aggregate["count"], aggregate["latest"])
 
 
 class SignUpView(APIView):
@@ -23,7 +53,10 @@ class SignUpView(APIView):
         serializer = SignUpSerializer(data=request.data)
         if serializer.is_valid():
             try:
-                serializer.save()
+                # The unique constraints are the final check on the username
+                # and email, so a violation must only roll back this signup
+                with transaction.atomic():
+                    serializer.save()
                 return Response(
                     {"message": "Registration successful"},
                     status=201,
@@ -38,6 +71,26 @@ class SignUpView(APIView):
         return Response(serializer.errors, status=400)
 
 
+class AvailabilityView(APIView):
+    # Called on every keystroke of the signup form, so skip token parsing
+    authentication_classes = []
+
+    def get(self, request):
+        username = request.query_params.get("username")
+        email = request.query_params.get("email")
+        if not username and not email:
+            return Response(
+                {"message": "Missing username or email in request query."}, 400
+            )
+
+        availability = {}
+        if username:
+            availability["username_available"] = not username_taken(username)
+        if email:
+            availability["email_available"] = not email_taken(email)
+        return Response(availability, status=200)
+
+
 class LoginView(APIView):
     def post(self, request):
         serializer = LoginSerializer(data=request.data)
@@ -79,15 +132,18 @@ class SentFriendRequestView(APIView):
             return Response({"message": "Friend request sent successfully"}, status=201)
         return Response(serializer.errors, status=400)
 
+    @conditional(sent_requests_etag)
     def get(self, request):
         user = request.user
         sent_requests = FriendRequest.objects.filter(
             from_user=user,
             status="pending",
+        ).values(*GetSentFriendRequestValuesSerializer.lookups())
+        friend_requests = GetSentFriendRequestValuesSerializer().serialize(
+            sent_requests
         )
-        serializer = GetSentFriendRequestSerializer(sent_requests, many=True)
         return Response(
-            {"count": sent_requests.count(), "friend_requests": serializer.data},
+            {"count": len(friend_requests), "friend_requests": friend_requests},
             status=200,
         )
 
@@ -112,15 +168,19 @@ class CancelFriendRequestView(APIView):
 class GetFriendRequestListView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    @conditional(received_requests_etag)
+    @cache_response("friend-requests:{user_id}")
     def get(self, request):
         user = request.user
         received_requests = FriendRequest.objects.filter(
             to_user=user,
             status="pending",
+        ).values(*GetFriendRequestValuesSerializer.lookups())
+        friend_requests = GetFriendRequestValuesSerializer().serialize(
+            received_requests
         )
-        serializer = GetFriendRequestSerializer(received_requests, many=True)
         return Response(
-            {"count": received_requests.count(), "friend_requests": serializer.data},
+            {"count": len(friend_requests), "friend_requests": friend_requests},
             status=200,
         )
 
@@ -144,43 +204,67 @@ class FriendRequestActionView(APIView):
 
 
 class GetFriendListView(APIView):
+    authentication_classes = [JWTTokenUserAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
+    @conditional(friend_list_etag)
+    @cache_response("friends:{user_id}")
     def get(self, request):
         user = request.user
 
-        # Get all accepted friend requests where the current user is either from_user or to_user
-        sent_friends = FriendRequest.objects.filter(from_user=user, status="accepted")
-        received_friends = FriendRequest.objects.filter(to_user=user, status="accepted")
-
-        # Combine the friends from both queries, ensuring no duplicates
-        friend_users = set(
-            [friend.to_user for friend in sent_friends]
-            + [friend.from_user for friend in received_friends]
+        # Joined in the query rather than read from the friend graph cache,
+        # which can lag in other processes; the cached body must match the
+        # ETag computed from Friendship
+        friend_users = CustomUser.objects.filter(friend_of__user_id=user.id).values(
+            *UserValuesSerializer.lookups()
         )
 
-        # Serialize the friend user objects
-        serializer = UserSerializer(friend_users, many=True)
-
-        return Response(serializer.data, status=200)
+        # Serialize the friend user rows
+        return Response(UserValuesSerializer().serialize(friend_users), status=200)
 
 
 class GetAllUserView(ListAPIView):
     serializer_class = UserSerializer
+    pagination_class = UserListPagination
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
         user = self.request.user
 
-        friends = FriendRequest.objects.filter(
-            (Q(from_user=user) | Q(to_user=user)) & Q(status="accepted")
-        ).values_list("from_user", "to_user")
-        friend_ids = {user_id for friend_pair in friends for user_id in friend_pair}
-        pending_requests = FriendRequest.objects.filter(
-            (Q(from_user=user) | Q(to_user=user)) & Q(status="pending")
-        ).values_list("from_user", "to_user")
-        pending_ids = {
-            user_id for pending_pair in pending_requests for user_id in pending_pair
-        }
-        exclude_ids = friend_ids.union(pending_ids)
-        return CustomUser.objects.exclude(id__in=exclude_ids).exclude(id=user.id)
+        # Anti-joins keep the query size independent of the user's friend count
+        friendship = Friendship.objects.filter(user=user, friend=OuterRef("pk"))
+        sent = FriendRequest.objects.filter(
+            from_user=user, to_user=OuterRef("pk"), status="pending"
+        )
+        received = FriendRequest.objects.filter(
+            from_user=OuterRef("pk"), to_user=user, status="pending"
+        )
+        return CustomUser.objects.filter(
+            ~Exists(friendship), ~Exists(sent), ~Exists(received)
+        ).exclude(id=user.id)
+
+
+class FriendSuggestionListView(ListAPIView):
+    """People the user may know, ranked by mutual friend count."""
+
+    serializer_class = FriendSuggestionSerializer
+    pagination_class = FriendSuggestionPagination
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        user = self.request.user
+        # Suggestions are precomputed, so skip anyone befriended or
+        # requested since the last compute_friend_suggestions run, with the
+        # same anti-joins as GetAllUserView
+        friendship = Friendship.objects.filter(user=user, friend=OuterRef("suggested"))
+        sent = FriendRequest.objects.filter(
+            from_user=user, to_user=OuterRef("suggested"), status="pending"
+        )
+        received = FriendRequest.objects.filter(
+            from_user=OuterRef("suggested"), to_user=user, status="pending"
+        )
+        return (
+            FriendSuggestion.objects.filter(user=user)
+            .filter(~Exists(friendship), ~Exists(sent), ~Exists(received))
+            .select_related("suggested")
+        )
@@ -0,0 +1,62 @@
+from operator import itemgetter
+
+from rest_framework import serializers
+
+_datetime_to_representation = serializers.DateTimeField().to_representation
+
+
+class ValuesSerializer:
+    """
+    Read-only serializer building output dicts straight from ``.values()``
+    rows, for hot list endpoints.
+
+    It skips per-row field binding and ``to_representation`` dispatch, so
+    each subclass must mirror its ``ModelSerializer`` exactly (same keys in
+    the same order, same representations) for the rendered JSON to stay
+    byte-identical.
+
+    ``fields`` lists ``(key, source)`` pairs in output order. ``source`` is a
+    ``.values()`` lookup, ``None`` to call ``get_<key>(row)``, or a nested
+    ``ValuesSerializer`` subclass whose lookups are prefixed with ``key__``.
+    Keys in ``datetime_fields`` are rendered like DRF's ``DateTimeField``,
+    and ``extra_lookups`` are read by ``get_<key>`` methods.
+    """
+
+    fields = ()
+    datetime_fields = ()
+    extra_lookups = ()
+
+    def __init__(self, context=None, prefix=""):
+        self.context = context or {}
+        self.accessors = [
+            (key, self.build_accessor(key, source, prefix))
+            for key, source in self.fields
+        ]
+
+    @classmethod
+    def lookups(cls, prefix=""):
+        """Return the ``.values()`` lookups the serializer reads."""
+        lookups = []
+        for key, source in cls.fields:
+            if isinstance(source, type):
+                lookups.extend(source.lookups(f"{prefix}{key}__"))
+            elif source is not None:
+                lookups.append(prefix + source)
+        lookups.extend(prefix + lookup for lookup in cls.extra_lookups)
+        return lookups
+
+    def build_accessor(self, key, source, prefix):
+        if source is None:
+            return getattr(self, f"get_{key}")
+        if isinstance(source, type):
+            return source(self.context, f"{prefix}{key}__").to_representation
+        getter = itemgetter(prefix + source)
+        if key in self.datetime_fields:
+            return lambda row: _datetime_to_representation(getter(row))
+        return getter
+
+    def to_representation(self, row):
+        return {key: accessor(row) for key, accessor in self.accessors}
+
+    def serialize(self, rows):
+        return [self.to_representation(row) for row in rows]
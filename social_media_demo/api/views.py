@@ -1,9 +1,103 @@
+from asgiref.sync import sync_to_async
+from django.http import StreamingHttpResponse
 from django.shortcuts import render
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import authentication, permissions
+from rest_framework import authentication, exceptions, permissions
+from api.authentication import JWTTokenUserAuthentication
+from api.events import EventStreamRenderer, event_stream
+from api.renderers import ORJSONRenderer
 
 
 class HealthCheckView(APIView):
     def get(self, request):
         return Response("API Running!")
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView whose handlers are coroutines, run natively under ASGI.
+
+    Authentication is awaited through ``aauthenticate`` where the
+    authenticator provides it, so a request never leaves the event loop
+    unless a synchronous authenticator is configured.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.ainitial(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(
+                    self, request.method.lower(), self.http_method_not_allowed
+                )
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if hasattr(response, "__await__"):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def ainitial(self, request, *args, **kwargs):
+        self.format_kwarg = self.get_format_suffix(**kwargs)
+
+        neg = self.perform_content_negotiation(request)
+        request.accepted_renderer, request.accepted_media_type = neg
+
+        version, scheme = self.determine_version(request, *args, **kwargs)
+        request.version, request.versioning_scheme = version, scheme
+
+        await self.aperform_authentication(request)
+        self.check_permissions(request)
+        self.check_throttles(request)
+
+    async def aperform_authentication(self, request):
+        for authenticator in request.authenticators:
+            try:
+                if hasattr(authenticator, "aauthenticate"):
+                    user_auth_tuple = await authenticator.aauthenticate(request)
+                else:
+                    user_auth_tuple = await sync_to_async(authenticator.authenticate)(
+                        request
+                    )
+            except exceptions.APIException:
+                request._not_authenticated()
+                raise
+
+            if user_auth_tuple is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth_tuple
+                return
+
+        request._not_authenticated()
+
+
+class EventStreamView(AsyncAPIView):
+    """
+    Server-sent events for the current user: friend requests and their
+    answers, and likes and comments on the user's posts.
+    """
+
+    authentication_classes = [JWTTokenUserAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    renderer_classes = [ORJSONRenderer, EventStreamRenderer]
+
+    async def get(self, request):
+        response = StreamingHttpResponse(
+            event_stream(str(request.user.id)), content_type="text/event-stream"
+        )
+        response.headers["Cache-Control"] = "no-cache"
+        response.headers["X-Accel-Buffering"] = "no"
+        return response
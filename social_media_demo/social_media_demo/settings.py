@@ -141,8 +141,19 @@ AUTH_USER_MODEL = "api.CustomUser"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
-    )
+        "api.authentication.JWTAuthentication",
+    ),
+    # orjson-backed drop-ins for DRF's JSONRenderer and JSONParser; swap back
+    # to the rest_framework classes to use the stdlib json module
+    "DEFAULT_RENDERER_CLASSES": (
+        "api.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "api.renderers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
 }
 MEDIA_ROOT = os.path.join(BASE_DIR, "post_images")
 MEDIA_URL = "/post_images/"
@@ -154,3 +165,92 @@ SIMPLE_JWT = {
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
 ]
+
+# Authors with more friends than this are not fanned out on write; their
+# posts are merged into friends' timelines at read time instead.
+FEED_FANOUT_LIMIT = 5000
+
+# Spread Post counter writes over this many PostCounterShard rows per post
+# to relieve hot-row contention; 0 updates the Post columns directly.
+POST_COUNTER_SHARDS = 0
+
+# Coalesce likes_count deltas in memory and flush them every
+# COUNTER_FLUSH_INTERVAL seconds instead of updating the row per like.
+LIKES_COUNT_WRITE_BEHIND = False
+COUNTER_FLUSH_INTERVAL = 0.25
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+}
+
+# Cache alias holding each user's friend and pending-request ID sets. Writes
+# only invalidate the sets in the cache they were made through, so with the
+# per-process LocMemCache other workers see a change once their copy expires
+# after FRIEND_GRAPH_CACHE_TIMEOUT seconds. Point this at a shared backend
+# (e.g. RedisCache) to invalidate every worker at once and allow a longer
+# timeout.
+FRIEND_GRAPH_CACHE = "default"
+FRIEND_GRAPH_CACHE_TIMEOUT = 30
+
+# Resized WebP copies rendered for each uploaded post image, keyed by name
+# and bounded by their largest side in pixels
+POST_IMAGE_VARIANTS = {"thumbnail": 160, "feed": 720, "full": 1600}
+POST_IMAGE_QUALITY = 80
+POST_IMAGE_PLACEHOLDER = (
+    "data:image/gif;base64,R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7"
+)
+IMAGE_WORKER_PROCESSES = 2
+
+# Hand media bodies to the front-end server: "X-Accel-Redirect" (nginx, which
+# maps MEDIA_ACCEL_REDIRECT_PREFIX to an internal location for MEDIA_ROOT) or
+# "X-Sendfile" (Apache/lighttpd). None streams them from Django.
+MEDIA_SENDFILE_HEADER = None
+MEDIA_ACCEL_REDIRECT_PREFIX = "/protected-media/"
+MEDIA_CACHE_MAX_AGE = 60 * 60 * 24
+
+# Real-time events pushed over /events. The in-process broker only reaches
+# clients connected to the same ASGI process; point EVENT_BROKER at another
+# backend with the same publish/subscribe interface to fan out across them.
+# A client more than EVENT_QUEUE_SIZE events behind either loses its oldest
+# events ("drop_oldest") or is disconnected to reconnect ("disconnect").
+EVENT_BROKER = "api.events.InProcessBroker"
+EVENT_QUEUE_SIZE = 100
+EVENT_SLOW_CONSUMER_POLICY = "drop_oldest"
+EVENT_STREAM_HEARTBEAT = 15
+
+# Notifications of the same kind on the same post fold into one unread row
+# while it was last updated less than this many seconds ago.
+NOTIFICATION_COALESCE_WINDOW = 60 * 60 * 24
+
+# Users resolved from JWTs are cached per process for AUTH_USER_CACHE_TTL
+# seconds, up to AUTH_USER_CACHE_SIZE entries; 0 disables the cache.
+AUTH_USER_CACHE_SIZE = 10000
+AUTH_USER_CACHE_TTL = 60
+
+# Username/email availability checks consult a Bloom filter sized for
+# USER_FILTER_HEADROOM times the current users, rebuilt by a background
+# thread every USER_FILTER_REFRESH_INTERVAL seconds. Each process has its own
+# filter, so a miss only decides the availability endpoint; logins and
+# signups are backed by the database.
+USER_FILTER_ERROR_RATE = 0.01
+USER_FILTER_HEADROOM = 2
+USER_FILTER_REFRESH_INTERVAL = 60 * 10
+
+# Cached GET responses, invalidated by version bumps in api.response_cache.
+# Every entry is also keyed by the ETag computed from the database for the
+# request, so a write made on another process misses the cache even though
+# its bump only reached that process. LocMemCache evicts least recently used
+# entries beyond MAX_ENTRIES; a shared backend such as RedisCache or
+# FileBasedCache lets workers share entries, e.g.
+# {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+#  "LOCATION": "/var/tmp/social_media_demo_responses",
+#  "OPTIONS": {"MAX_ENTRIES": 10000}}
+CACHES["responses"] = {
+    "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    "LOCATION": "responses",
+    "OPTIONS": {"MAX_ENTRIES": 10000},
+}
+RESPONSE_CACHE = "responses"
+RESPONSE_CACHE_TIMEOUT = 60 * 5